@@ -0,0 +1,52 @@
+"""
+Library entry points for embedding the checker in other programs.
+
+Nothing here prints, renders progress or configures logging; results are
+plain dictionaries (the same ones the CLI outputs) delivered as each check
+completes.
+
+    from api import iter_check, aiter_check
+
+    for result in iter_check(['josh123', 'josh_dev'], category='developer', timeout=5):
+        if result['status'] == 'available':
+            ...
+
+    async for result in aiter_check(usernames, deadline=30, max_pending=50):
+        await queue.put(result)
+
+Keyword options not named below are passed to ``UsernameChecker`` (timeout,
+max_workers, delay, retry_policy, transport, ...).
+
+Ctrl-C is not swallowed: unfinished pairs are still yielded as 'timeout'
+results, then ``ScanInterrupted`` (a KeyboardInterrupt) is raised.
+"""
+
+from username_checker import ScanInterrupted, UsernameChecker
+
+
+def iter_check(usernames, category=None, platforms=None, deadline=None, **options):
+    """
+    Yield a result for every (username, platform) pair as it completes.
+
+    Args:
+        usernames: A username or an iterable of usernames (consumed lazily)
+        category: Filter by platform category
+        platforms: List of specific platforms to check
+        deadline: Optional time budget in seconds; pairs left unfinished are
+            yielded with status 'timeout'
+        **options: UsernameChecker settings
+    """
+    checker = UsernameChecker(**options)
+    yield from checker.iter_check(usernames, category, platforms, deadline)
+
+
+async def aiter_check(usernames, category=None, platforms=None, deadline=None, max_pending=100, **options):
+    """
+    ``async for`` variant of iter_check().
+
+    At most ``max_pending`` results are buffered for a slow consumer; beyond
+    that no new checks are started until it catches up.
+    """
+    checker = UsernameChecker(**options)
+    async for result in checker.aiter_check(usernames, category, platforms, deadline, max_pending):
+        yield result
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Startup benchmark for the CLI fast paths.
+
+Runs each command in a fresh interpreter several times and reports the
+median wall time, then lists the slowest imports ``--list-platforms`` adds on
+top of a bare interpreter, as measured by ``python -X importtime``.
+
+    python bench_startup.py
+    python bench_startup.py --runs 20 --top 15
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+MAIN = os.path.join(HERE, 'main.py')
+
+COMMANDS = [
+    ('interpreter only', ['-c', 'pass']),
+    ('--help', [MAIN, '--help']),
+    ('--list-categories', [MAIN, '--list-categories']),
+    ('--list-platforms', [MAIN, '--list-platforms']),
+    ('import username_checker', ['-c', 'import username_checker']),
+]
+
+
+def time_command(args, runs):
+    """Median wall time in milliseconds of running the interpreter with args."""
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable] + args, cwd=HERE,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def import_times(args):
+    """Module name -> cumulative import time in microseconds."""
+    proc = subprocess.run([sys.executable, '-X', 'importtime'] + args, cwd=HERE,
+                          stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    imports = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        imports[name.strip()] = int(cumulative)
+    return imports
+
+
+def slowest_imports(args, top):
+    """(cumulative microseconds, module) for imports not made by the bare interpreter."""
+    startup = import_times(['-c', 'pass'])
+    imports = [(cumulative, name) for name, cumulative in import_times(args).items()
+               if name not in startup]
+    return sorted(imports, reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark CLI startup time")
+    parser.add_argument('--runs', type=int, default=10, help='Runs per command (default: 10)')
+    parser.add_argument('--top', type=int, default=10,
+                        help='Slowest imports to list for --list-platforms (default: 10)')
+    args = parser.parse_args()
+
+    # Warm the bytecode and catalog caches so the numbers reflect steady state
+    subprocess.run([sys.executable, MAIN, '--list-platforms'], cwd=HERE,
+                   stdout=subprocess.DEVNULL, check=True)
+
+    baseline = None
+    print(f"{'command':<26} {'median ms':>10} {'over interpreter':>17}")
+    for label, command in COMMANDS:
+        elapsed = time_command(command, args.runs)
+        if baseline is None:
+            baseline = elapsed
+        print(f"{label:<26} {elapsed:>10.1f} {elapsed - baseline:>17.1f}")
+
+    print("\nSlowest imports added by --list-platforms (cumulative ms):")
+    for cumulative, name in slowest_imports([MAIN, '--list-platforms'], args.top):
+        print(f"  {cumulative / 1000:>8.1f}  {name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+"""
+Record/replay HTTP cassettes for offline, deterministic runs.
+
+A cassette is a directory holding ``requests.jsonl`` (one recorded HTTP
+exchange per line: method, URL, status, headers, elapsed time and a bounded
+prefix of the decoded body) and ``results.jsonl`` (the classification each
+check produced while recording). Both are plain JSON lines so cassettes can
+be inspected, trimmed or edited by hand.
+
+Recording and replay plug in as ``requests`` transport adapters mounted on
+the checkers' sessions, so redirects, streaming and the rule engine all run
+exactly as they do against the network. Every hop of a redirect chain is
+recorded as its own exchange.
+"""
+
+import base64
+import io
+import json
+import os
+import threading
+import time
+from datetime import timedelta
+
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+from rules import DEFAULT_MAX_BODY_BYTES
+
+REQUESTS_FILE = 'requests.jsonl'
+RESULTS_FILE = 'results.jsonl'
+
+
+class MissingRecording(requests.RequestException):
+    """Replay was asked for a request the cassette never saw; not worth retrying."""
+
+
+class RecordedBody(io.BytesIO):
+    """Recorded body prefix; truncated tells the rules the real body went on."""
+
+    def __init__(self, body, truncated=False):
+        super().__init__(body)
+        self.truncated = truncated
+
+
+def _key(method, url):
+    return f"{method.upper()} {url}"
+
+
+class Cassette:
+    """Recorded exchanges and results stored in a directory."""
+
+    def __init__(self, directory, max_body_bytes=DEFAULT_MAX_BODY_BYTES):
+        self.directory = directory
+        self.max_body_bytes = max_body_bytes
+        self.lock = threading.Lock()
+        self.exchanges = {}
+        self.cursors = {}
+        self.files = {}
+
+    @property
+    def requests_path(self):
+        return os.path.join(self.directory, REQUESTS_FILE)
+
+    @property
+    def results_path(self):
+        return os.path.join(self.directory, RESULTS_FILE)
+
+    # Recording
+
+    def start_recording(self):
+        """Create the directory and truncate any previous recording."""
+        os.makedirs(self.directory, exist_ok=True)
+        for name, path in (('requests', self.requests_path), ('results', self.results_path)):
+            self.files[name] = open(path, 'w', encoding='utf-8')
+
+    def _append(self, name, record):
+        line = json.dumps(record, ensure_ascii=False) + '\n'
+        with self.lock:
+            self.files[name].write(line)
+
+    def record_exchange(self, exchange):
+        self._append('requests', exchange)
+
+    def record_result(self, result):
+        self._append('results', result)
+
+    def close(self):
+        with self.lock:
+            for f in self.files.values():
+                f.close()
+            self.files = {}
+
+    # Replay
+
+    def load(self):
+        """Read recorded exchanges; repeated requests replay in recorded order."""
+        if not os.path.exists(self.requests_path):
+            raise FileNotFoundError(f"No cassette found in {self.directory}")
+        with open(self.requests_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    exchange = json.loads(line)
+                    self.exchanges.setdefault(_key(exchange['method'], exchange['url']), []).append(exchange)
+        return self
+
+    def next_exchange(self, method, url):
+        """The next recorded exchange for a request, repeating the last one."""
+        key = _key(method, url)
+        recorded = self.exchanges.get(key)
+        if not recorded:
+            return None
+        with self.lock:
+            index = self.cursors.get(key, 0)
+            self.cursors[key] = index + 1
+        return recorded[min(index, len(recorded) - 1)]
+
+    def load_results(self):
+        """Recorded results keyed by (username, platform)."""
+        results = {}
+        if os.path.exists(self.results_path):
+            with open(self.results_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    if line.strip():
+                        result = json.loads(line)
+                        results[(result['username'], result['platform'])] = result
+        return results
+
+
+class RecordingAdapter(HTTPAdapter):
+    """HTTPAdapter that saves each exchange (with a body prefix) to a cassette."""
+
+    def __init__(self, cassette, **kwargs):
+        super().__init__(**kwargs)
+        self.cassette = cassette
+
+    def send(self, request, stream=False, **kwargs):
+        start = time.perf_counter()
+        response = super().send(request, stream=True, **kwargs)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        # Keep only a bounded, already-decoded prefix; live callers see
+        # exactly what replay will serve later.
+        limit = self.cassette.max_body_bytes
+        body = response.raw.read(limit + 1, decode_content=True) if request.method != 'HEAD' else b''
+        truncated = len(body) > limit
+        body = body[:limit]
+        if truncated:
+            response.raw.close()
+        response.raw.release_conn()
+        response.raw = RecordedBody(body, truncated)
+
+        self.cassette.record_exchange({
+            'method': request.method,
+            'url': request.url,
+            'status': response.status_code,
+            'reason': response.reason,
+            'headers': list(response.headers.items()),
+            'elapsed_ms': round(elapsed_ms, 2),
+            'body': base64.b64encode(body).decode('ascii'),
+            'truncated': truncated,
+        })
+        return response
+
+
+class ReplayAdapter(BaseAdapter):
+    """Adapter that answers requests from a cassette instead of the network."""
+
+    def __init__(self, cassette, realtime=False):
+        super().__init__()
+        self.cassette = cassette
+        self.realtime = realtime
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        exchange = self.cassette.next_exchange(request.method, request.url)
+        if exchange is None:
+            raise MissingRecording(f"No recorded response for {request.method} {request.url}",
+                                   request=request)
+        if self.realtime:
+            time.sleep(exchange['elapsed_ms'] / 1000)
+
+        response = requests.Response()
+        response.status_code = exchange['status']
+        response.reason = exchange.get('reason')
+        response.headers = CaseInsensitiveDict(exchange['headers'])
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.raw = RecordedBody(base64.b64decode(exchange['body']), exchange.get('truncated', False))
+        response.url = request.url
+        response.request = request
+        response.connection = self
+        response.elapsed = timedelta(milliseconds=exchange['elapsed_ms'])
+        return response
+
+    def close(self):
+        pass
+
+
+class CassetteTransport:
+    """Mounts recording or replay adapters on checker sessions."""
+
+    def __init__(self, cassette, mode, realtime=False):
+        if mode not in ('record', 'replay'):
+            raise ValueError(f"Unknown cassette mode: {mode}")
+        self.cassette = cassette
+        self.mode = mode
+        self.realtime = realtime
+
+    def mount(self, session):
+        if self.mode == 'record':
+            adapter = RecordingAdapter(self.cassette)
+        else:
+            adapter = ReplayAdapter(self.cassette, self.realtime)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+
+
+def compare_results(recorded, results):
+    """
+    Differences between recorded and replayed classifications.
+
+    Returns:
+        List of (username, platform, recorded status, replayed status)
+    """
+    changes = []
+    for result in results:
+        before = recorded.get((result['username'], result['platform']))
+        if before is not None and before['status'] != result['status']:
+            changes.append((result['username'], result['platform'], before['status'], result['status']))
+    return sorted(changes)
@@ -0,0 +1,95 @@
+"""
+Platform catalog loading with a precompiled cache.
+
+``platforms.json`` is parsed once and cached with ``marshal`` next to the
+bytecode in ``__pycache__``, together with a small index (sorted names,
+categories and per-category counts). Listing commands read only that cache,
+so they never import the HTTP stack. The cache is keyed on the JSON file's
+size and mtime and rebuilt automatically when it changes.
+"""
+
+import json
+import marshal
+import os
+
+CATALOG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'platforms.json')
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '__pycache__')
+CACHE_VERSION = 1
+
+_loaded = {}
+
+
+def _cache_path(path):
+    name = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(CACHE_DIR, f"{name}.catalog-{CACHE_VERSION}.marshal")
+
+
+def _build_index(platforms):
+    category_counts = {}
+    for config in platforms.values():
+        category = config.get('category', 'unknown')
+        category_counts[category] = category_counts.get(category, 0) + 1
+    return {
+        'names': sorted(platforms),
+        'categories': sorted(category_counts),
+        'category_counts': category_counts,
+    }
+
+
+def load_catalog(path=CATALOG_PATH):
+    """
+    Return ``{'platforms': {...}, 'index': {...}}`` for a catalog file,
+    using the precompiled cache when it is fresh.
+    """
+    if path in _loaded:
+        return _loaded[path]
+
+    stat = os.stat(path)
+    key = (stat.st_size, stat.st_mtime_ns)
+    cache_path = _cache_path(path)
+
+    try:
+        with open(cache_path, 'rb') as f:
+            cached = marshal.load(f)
+        if cached.get('key') == key:
+            _loaded[path] = cached
+            return cached
+    except (OSError, EOFError, ValueError, TypeError, AttributeError):
+        pass
+
+    with open(path, 'r', encoding='utf-8') as f:
+        platforms = json.load(f)
+    catalog = {'key': key, 'platforms': platforms, 'index': _build_index(platforms)}
+
+    # The cache is an optimisation only; a read-only checkout still works.
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            marshal.dump(catalog, f)
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        pass
+
+    _loaded[path] = catalog
+    return catalog
+
+
+def load_platforms(path=CATALOG_PATH):
+    """Platform name -> configuration mapping."""
+    return load_catalog(path)['platforms']
+
+
+def get_categories(path=CATALOG_PATH):
+    """Sorted list of platform categories."""
+    return load_catalog(path)['index']['categories']
+
+
+def get_category_counts(path=CATALOG_PATH):
+    """Number of platforms in each category."""
+    return load_catalog(path)['index']['category_counts']
+
+
+def get_platform_names(path=CATALOG_PATH):
+    """Sorted list of platform names."""
+    return load_catalog(path)['index']['names']
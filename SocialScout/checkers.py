@@ -1,290 +1,429 @@
 """
 Different checker implementations for various platform types.
+
+Each checker decides *how* to fetch a platform (which URL, method, headers
+and redirect handling) and contributes a default rule list; *what* the
+response means is decided by the compiled rules in ``rules.py``.
 """
 
 import requests
+import threading
 import time
-import re
 from urllib.parse import urljoin
-from bs4 import BeautifulSoup
-import json
+from rules import FOLLOW, RESULTS, compile_plan
+import profiler
+
+# Responses whose unread remainder is at most this many bytes are drained so
+# the connection can be reused; larger ones are dropped instead.
+DRAIN_LIMIT = 64 * 1024
+
+DEFAULT_NOT_FOUND_INDICATORS = [
+    'user not found',
+    'profile not found',
+    'page not found',
+    'does not exist',
+    'user does not exist'
+]
+
+DEFAULT_FOUND_INDICATORS = [
+    'profile',
+    'posts',
+    'followers',
+    'following'
+]
+
+DEFAULT_REDIRECT_INDICATORS = [
+    '/signin',
+    '/login',
+    '/register',
+    '/404',
+    '/error'
+]
+
+class ProbeSession(requests.Session):
+    """
+    Session that leaves redirect bodies to the checker.
+
+    With allow_redirects=False requests still reads the whole 3xx body to
+    prepare Response.next, which the checkers never use; skipping that lets
+    RedirectChecker drain or drop the body itself.
+    """
+
+    def resolve_redirects(self, resp, req, *args, yield_requests=False, **kwargs):
+        if yield_requests:
+            return iter(())
+        return super().resolve_redirects(resp, req, *args, yield_requests=yield_requests, **kwargs)
+
+
+class CheckError(Exception):
+    """A check that could not be completed, with the retries spent on it."""
+
+    def __init__(self, message, retries=0):
+        super().__init__(message)
+        self.retries = retries
+
+
+class CheckStopped(CheckError):
+    """A check cut short because its scan was cancelled or ran out of time."""
+
+class TransferStats:
+    """Bytes moved by a checker's probes: as sent by the server, and decoded."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.responses = 0
+        self.wire_bytes = 0
+        self.decoded_bytes = 0
+        self.capped = 0
+
+    def add(self, wire_bytes, decoded_bytes, capped=False):
+        with self.lock:
+            self.responses += 1
+            self.wire_bytes += wire_bytes
+            self.decoded_bytes += decoded_bytes
+            self.capped += capped
 
 class BaseChecker:
     """Base class for all checkers."""
-    
-    def __init__(self, timeout=10):
+
+    check_name = 'Base'
+    # Results the default rules may produce
+    rule_results = RESULTS
+
+    def __init__(self, timeout=10, retry_policy=None, cancel_event=None):
         self.timeout = timeout
-        self.session = requests.Session()
+        # None means a single attempt per request (see retry.RetryPolicy)
+        self.retry_policy = retry_policy
+        # Set to stop retrying and starting requests; stop_at (a monotonic
+        # time) caps each request's timeout at what is left of a deadline.
+        # Each scan hands in its own pair; a check reads them once when it
+        # starts (see _limits) so it keeps honouring the scan it belongs to
+        self.cancel_event = cancel_event if cancel_event is not None else threading.Event()
+        self.stop_at = None
+        self.session = ProbeSession()
         # Set a user agent to avoid blocking
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         })
-    
+        self.transfer = TransferStats()
+        # id(platform_config) -> (platform_config, plan); holding the config
+        # keeps its id from being reused while the plan is cached
+        self.plans = {}
+
+    def default_rules(self, platform_config):
+        """Rules applied after the platform's own rules."""
+        return [
+            {'status_code': 404, 'result': 'available'},
+            {'status_code': 200, 'result': 'taken'}
+        ]
+
+    def follow_redirects(self, platform_config):
+        return True
+
+    def get_plan(self, platform_name, platform_config):
+        """Compiled detection plan for a platform, built on first use."""
+        cached = self.plans.get(id(platform_config))
+        if cached is None:
+            plan = compile_plan(platform_name, platform_config,
+                                self.default_rules(platform_config),
+                                self.follow_redirects(platform_config), self.rule_results)
+            cached = self.plans[id(platform_config)] = (platform_config, plan)
+        return cached[1]
+
+    def build_request(self, platform_config, username):
+        """Return (method, url, extra request kwargs) for a probe."""
+        url = platform_config['url_pattern'].format(username=username)
+        return platform_config.get('method', 'GET'), url, {}
+
     def check(self, platform_name, platform_config, username):
         """Check username availability on the platform."""
-        raise NotImplementedError
-    
-    def _make_request(self, method, url, **kwargs):
-        """Make HTTP request with error handling."""
-        start_time = time.time()
+        url = platform_config['url_pattern'].format(username=username)
+
+        limits = self._limits()
         try:
-            response = self.session.request(
-                method=method,
-                url=url,
-                timeout=self.timeout,
-                **kwargs
-            )
-            response_time = round((time.time() - start_time) * 1000, 2)
-            return response, response_time
-        except requests.RequestException as e:
+            plan = self.get_plan(platform_name, platform_config)
+            method, request_url, kwargs = self.build_request(platform_config, username)
+
+            start_time = time.time()
+            response, response_time, retries = self._make_request(
+                method, request_url, self._max_retries(platform_config), limits, stream=True,
+                allow_redirects=plan.follow_redirects, **kwargs)
+
+            verdict = plan.evaluate(response)
+            self._release(response, verdict)
             response_time = round((time.time() - start_time) * 1000, 2)
-            # Silently handle errors - don't raise in normal mode
-            return None, response_time
 
-class StandardChecker(BaseChecker):
-    """Standard checker that uses HTTP status codes."""
-    
-    def check(self, platform_name, platform_config, username):
-        url = platform_config['url_pattern'].format(username=username)
-        method = platform_config.get('method', 'GET')
-        
+            result = self._result(platform_name, platform_config, username, url,
+                                  verdict.status, response, response_time)
+            if retries:
+                result['retries'] = retries
+            return result
+
+        except Exception as e:
+            raise self._failure(e, limits)
+
+    def _result(self, platform_name, platform_config, username, url, status, response, response_time):
+        result = {
+            'platform': platform_name,
+            'username': username,
+            'status': status,
+            'url': url,
+            'response_time': response_time,
+            'category': platform_config.get('category', 'unknown')
+        }
+        if response is not None:
+            result['status_code'] = response.status_code
+        return result
+
+    def _release(self, response, verdict):
+        """Hand the connection back to the pool, or drop it if the rest of the body is large."""
+        self._release_conn(response, verdict)
+        self._account(response, verdict.body_bytes, verdict.body_capped)
+
+    def _account(self, response, decoded_bytes, capped=False):
         try:
-            result = self._make_request(method, url)
-            if result is None:
-                return {
-                    'platform': platform_name,
-                    'username': username,
-                    'status': 'unknown',
-                    'url': url,
-                    'response_time': 0,
-                    'category': platform_config.get('category', 'unknown')
-                }
-            
-            response, response_time = result
-            
-            # Determine availability based on status code
-            if response.status_code == 404:
-                status = 'available'
-            elif response.status_code == 200:
-                status = 'taken'
+            # urllib3 counts the (still compressed) bytes read off the socket
+            wire_bytes = response.raw.tell()
+        except (AttributeError, ValueError):
+            # Replayed or closed in-memory bodies
+            wire_bytes = decoded_bytes
+        self.transfer.add(wire_bytes, decoded_bytes, capped)
+
+    def _release_conn(self, response, verdict):
+        if verdict.body_complete:
+            return
+        remaining = response.headers.get('Content-Length')
+        if remaining is not None and remaining.isdigit() and int(remaining) - verdict.body_bytes <= DRAIN_LIMIT:
+            drain = getattr(response.raw, 'drain_conn', None)
+            if drain is not None:
+                drain()
+                return
+        response.close()
+
+    def _max_retries(self, platform_config):
+        if self.retry_policy is None:
+            return 0
+        return self.retry_policy.retries_for(platform_config)
+
+    def _limits(self):
+        """The (cancel_event, stop_at) a check started under."""
+        return self.cancel_event, self.stop_at
+
+    @staticmethod
+    def _stop_reason(limits):
+        cancel_event, stop_at = limits
+        if cancel_event.is_set():
+            return "Scan cancelled"
+        if stop_at is not None and time.monotonic() >= stop_at:
+            return "Deadline reached"
+        return None
+
+    def _failure(self, error, limits):
+        """CheckError for a failed check; CheckStopped if the scan cut it short."""
+        if isinstance(error, CheckStopped):
+            return error
+        retries = getattr(error, 'retries', 0)
+        reason = self._stop_reason(limits)
+        if reason:
+            return CheckStopped(f"{reason}: {error}", retries)
+        return CheckError(f"{self.check_name} check failed: {error}", retries)
+
+    def _request_timeout(self, attempt, limits):
+        """Timeout for the next attempt; raises CheckStopped once cancelled or out of time."""
+        reason = self._stop_reason(limits)
+        if reason:
+            raise CheckStopped(f"{reason} after {attempt} attempt(s)", max(attempt - 1, 0))
+        stop_at = limits[1]
+        if stop_at is None:
+            return self.timeout
+        return min(self.timeout, stop_at - time.monotonic())
+
+    def _make_request(self, method, url, max_retries=0, limits=None, **kwargs):
+        """
+        Make an HTTP request, retrying transient failures per the retry policy.
+
+        Returns (response, response_time, retries). A retryable status that
+        is still failing after the last retry is returned for the rules to
+        classify; a request that never got a response raises CheckError
+        carrying the last exception. Once the check's cancel_event is set no
+        new attempt is made and backoff ends early.
+        """
+        limits = limits or self._limits()
+        cancel_event = limits[0]
+        policy = self.retry_policy
+        if policy is not None:
+            policy.first_attempt()
+        start_time = time.time()
+        attempt = 0
+        while True:
+            timeout = self._request_timeout(attempt, limits)
+            try:
+                with profiler.timed('network'):
+                    response = self.session.request(
+                        method=method,
+                        url=url,
+                        timeout=timeout,
+                        **kwargs
+                    )
+            except requests.RequestException as e:
+                reason = self._stop_reason(limits)
+                if reason:
+                    raise CheckStopped(f"{reason} after {attempt + 1} attempt(s): {e}", attempt)
+                if policy is None or not policy.should_retry(attempt, max_retries, error=e):
+                    raise CheckError(f"{type(e).__name__} after {attempt + 1} attempt(s): {e}", attempt)
+                policy.sleep(attempt, cancel_event=cancel_event)
             else:
-                status = 'unknown'
-            
-            return {
-                'platform': platform_name,
-                'username': username,
-                'status': status,
-                'url': url,
-                'status_code': response.status_code,
-                'response_time': response_time,
-                'category': platform_config.get('category', 'unknown')
-            }
-            
-        except Exception as e:
-            raise Exception(f"Standard check failed: {e}")
+                if (policy is None or cancel_event.is_set()
+                        or not policy.should_retry(attempt, max_retries, response=response)):
+                    response_time = round((time.time() - start_time) * 1000, 2)
+                    return response, response_time, attempt
+                response.close()
+                self._account(response, 0)
+                policy.sleep(attempt, response, cancel_event)
+            attempt += 1
+
+class StandardChecker(BaseChecker):
+    """Standard checker that uses HTTP status codes."""
+
+    check_name = 'Standard'
 
 class ProfileChecker(BaseChecker):
     """Checker that analyzes page content to determine availability."""
-    
-    def check(self, platform_name, platform_config, username):
-        url = platform_config['url_pattern'].format(username=username)
-        method = platform_config.get('method', 'GET')
-        
-        try:
-            response, response_time = self._make_request(method, url)
-            
-            # Check for specific indicators in the response
-            content = response.text.lower()
-            
-            # Platform-specific content checks
-            not_found_indicators = platform_config.get('not_found_indicators', [
-                'user not found',
-                'profile not found',
-                'page not found',
-                'does not exist',
-                'user does not exist'
-            ])
-            
-            found_indicators = platform_config.get('found_indicators', [
-                'profile',
-                'posts',
-                'followers',
-                'following'
-            ])
-            
-            # Check for "not found" indicators
-            for indicator in not_found_indicators:
-                if indicator.lower() in content:
-                    status = 'available'
-                    break
-            else:
-                # Check for "found" indicators if no "not found" found
-                if response.status_code == 200:
-                    for indicator in found_indicators:
-                        if indicator.lower() in content:
-                            status = 'taken'
-                            break
-                    else:
-                        status = 'unknown'
-                else:
-                    status = 'available' if response.status_code == 404 else 'unknown'
-            
-            return {
-                'platform': platform_name,
-                'username': username,
-                'status': status,
-                'url': url,
-                'status_code': response.status_code,
-                'response_time': response_time,
-                'category': platform_config.get('category', 'unknown')
-            }
-            
-        except Exception as e:
-            raise Exception(f"Profile check failed: {e}")
+
+    check_name = 'Profile'
+
+    def default_rules(self, platform_config):
+        not_found = platform_config.get('not_found_indicators', DEFAULT_NOT_FOUND_INDICATORS)
+        found = platform_config.get('found_indicators', DEFAULT_FOUND_INDICATORS)
+        return [
+            {'body': not_found, 'result': 'available'},
+            {'status_code': 200, 'body': found, 'result': 'taken'},
+            {'status_code': 200, 'result': 'unknown'},
+            {'status_code': 404, 'result': 'available'}
+        ]
 
 class APIChecker(BaseChecker):
     """Checker for platforms that provide API endpoints."""
-    
-    def check(self, platform_name, platform_config, username):
+
+    check_name = 'API'
+
+    def default_rules(self, platform_config):
+        exists_field = platform_config.get('exists_field', 'exists')
+        return [
+            # Check if user exists in API response
+            {'status_code': 200, 'json': {'path': exists_field, 'truthy': True}, 'result': 'taken'},
+            {'status_code': 200, 'json': {'path': exists_field, 'exists': True}, 'result': 'available'},
+            # Assume taken if API returns data
+            {'status_code': 200, 'json': {}, 'result': 'taken'},
+            {'status_code': 404, 'result': 'available'}
+        ]
+
+    def build_request(self, platform_config, username):
         api_url = platform_config['api_url'].format(username=username)
-        headers = platform_config.get('headers', {})
-        
-        try:
-            response, response_time = self._make_request('GET', api_url, headers=headers)
-            
-            if response.status_code == 200:
-                try:
-                    data = response.json()
-                    # Check if user exists in API response
-                    exists_field = platform_config.get('exists_field', 'exists')
-                    if exists_field in data:
-                        status = 'taken' if data[exists_field] else 'available'
-                    else:
-                        status = 'taken'  # Assume taken if API returns data
-                except json.JSONDecodeError:
-                    status = 'unknown'
-            elif response.status_code == 404:
-                status = 'available'
-            else:
-                status = 'unknown'
-            
-            profile_url = platform_config['url_pattern'].format(username=username)
-            
-            return {
-                'platform': platform_name,
-                'username': username,
-                'status': status,
-                'url': profile_url,
-                'api_url': api_url,
-                'status_code': response.status_code,
-                'response_time': response_time,
-                'category': platform_config.get('category', 'unknown')
-            }
-            
-        except Exception as e:
-            raise Exception(f"API check failed: {e}")
+        return 'GET', api_url, {'headers': platform_config.get('headers', {})}
+
+    def _result(self, platform_name, platform_config, username, url, status, response, response_time):
+        result = super()._result(platform_name, platform_config, username, url,
+                                 status, response, response_time)
+        result['api_url'] = platform_config['api_url'].format(username=username)
+        return result
 
 class SocialMediaChecker(BaseChecker):
     """Specialized checker for social media platforms."""
-    
-    def check(self, platform_name, platform_config, username):
-        url = platform_config['url_pattern'].format(username=username)
-        
-        try:
-            response, response_time = self._make_request('GET', url)
-            
-            # Many social media platforms return 200 even for non-existent users
-            # but include specific content or meta tags
-            if response.status_code == 200:
-                soup = BeautifulSoup(response.content, 'html.parser')
-                
-                # Check page title
-                title = soup.find('title')
-                if title:
-                    title_text = title.get_text().lower()
-                    if any(phrase in title_text for phrase in ['not found', 'doesn\'t exist', 'user not found']):
-                        status = 'available'
-                    else:
-                        status = 'taken'
-                else:
-                    status = 'unknown'
-                    
-                # Additional checks for specific platforms
-                platform_lower = platform_name.lower()
-                if platform_lower == 'twitter' or platform_lower == 'x':
-                    # Check for suspended account or not found
-                    if 'account suspended' in response.text.lower():
-                        status = 'taken'  # Suspended accounts are still taken
-                elif platform_lower == 'instagram':
-                    # Instagram specific checks
-                    if 'sorry, this page isn\'t available' in response.text.lower():
-                        status = 'available'
-                elif platform_lower == 'tiktok':
-                    # TikTok specific checks
-                    if 'couldn\'t find this account' in response.text.lower():
-                        status = 'available'
-                        
-            elif response.status_code == 404:
-                status = 'available'
-            else:
-                status = 'unknown'
-            
-            return {
-                'platform': platform_name,
-                'username': username,
-                'status': status,
-                'url': url,
-                'status_code': response.status_code,
-                'response_time': response_time,
-                'category': platform_config.get('category', 'unknown')
-            }
-            
-        except Exception as e:
-            raise Exception(f"Social media check failed: {e}")
+
+    check_name = 'Social media'
+
+    def default_rules(self, platform_config):
+        # Many social media platforms return 200 even for non-existent users
+        # but say so in the page title; platform-specific markers live in
+        # the platform's own rules in platforms.json
+        return [
+            {'status_code': 200, 'title': ['not found', 'doesn\'t exist', 'user not found'],
+             'result': 'available'},
+            {'status_code': 200, 'title': True, 'result': 'taken'},
+            {'status_code': 200, 'result': 'unknown'},
+            {'status_code': 404, 'result': 'available'}
+        ]
+
+    def build_request(self, platform_config, username):
+        return 'GET', platform_config['url_pattern'].format(username=username), {}
 
 class RedirectChecker(BaseChecker):
-    """Checker that follows redirects to determine availability."""
-    
+    """
+    Checker that classifies redirects to determine availability.
+
+    By default redirects are not followed: each hop is requested with
+    ``allow_redirects=False`` and the ``Location`` header is matched against
+    ``redirect_indicators``, so a bounce to a login page costs one small 3xx
+    response instead of a full page download. Further hops (at most
+    ``max_redirect_hops``) are requested only while the target is still
+    inconclusive. Set ``"redirect_mode": "follow"`` on a platform to get the
+    old follow-everything behaviour.
+    """
+
+    check_name = 'Redirect'
+    rule_results = RESULTS + (FOLLOW,)
+    DEFAULT_MAX_HOPS = 3
+
+    def default_rules(self, platform_config):
+        redirect_indicators = platform_config.get('redirect_indicators', DEFAULT_REDIRECT_INDICATORS)
+        return [
+            # If redirected to a generic page, username is likely available
+            {'redirect': redirect_indicators, 'result': 'available'},
+            {'redirect': True, 'result': FOLLOW},
+            {'status_code': 200, 'result': 'taken'},
+            {'status_code': 404, 'result': 'available'}
+        ]
+
+    def follow_redirects(self, platform_config):
+        return platform_config.get('redirect_mode', 'location') == 'follow'
+
     def check(self, platform_name, platform_config, username):
         url = platform_config['url_pattern'].format(username=username)
-        
+        max_hops = platform_config.get('max_redirect_hops', self.DEFAULT_MAX_HOPS)
+
+        limits = self._limits()
         try:
-            response, response_time = self._make_request('GET', url, allow_redirects=True)
-            
-            # Check if we were redirected to a different URL
-            if response.url != url:
-                # If redirected to a generic page, username is likely available
-                redirect_indicators = platform_config.get('redirect_indicators', [
-                    '/signin',
-                    '/login',
-                    '/register',
-                    '/404',
-                    '/error'
-                ])
-                
-                if any(indicator in response.url.lower() for indicator in redirect_indicators):
-                    status = 'available'
-                else:
-                    status = 'taken'
-            else:
-                # No redirect, check status code
-                if response.status_code == 200:
+            plan = self.get_plan(platform_name, platform_config)
+            current_url = url
+            hops = 0
+            retries = 0
+            start_time = time.time()
+
+            while True:
+                try:
+                    response, _, hop_retries = self._make_request(
+                        'GET', current_url, self._max_retries(platform_config), limits,
+                        stream=True, allow_redirects=plan.follow_redirects)
+                except CheckError as e:
+                    e.retries += retries
+                    raise
+                retries += hop_retries
+
+                verdict = plan.evaluate(response)
+                status = verdict.status
+                if status != FOLLOW:
+                    self._release(response, verdict)
+                    break
+
+                # Redirected somewhere that isn't a login/error page yet
+                if plan.follow_redirects or hops >= max_hops:
+                    self._release(response, verdict)
                     status = 'taken'
-                elif response.status_code == 404:
-                    status = 'available'
-                else:
-                    status = 'unknown'
-            
-            return {
-                'platform': platform_name,
-                'username': username,
-                'status': status,
-                'url': url,
-                'final_url': response.url,
-                'status_code': response.status_code,
-                'response_time': response_time,
-                'category': platform_config.get('category', 'unknown')
-            }
-            
+                    break
+
+                # Drain a small 3xx body so the connection is reused; drop large ones
+                self._release(response, verdict)
+                current_url = urljoin(current_url, response.headers['Location'])
+                hops += 1
+
+            result = self._result(platform_name, platform_config, username, url, status, response,
+                                  round((time.time() - start_time) * 1000, 2))
+            result['final_url'] = plan.redirect_target(response) or response.url
+            result['redirect_hops'] = len(response.history) if plan.follow_redirects else hops
+            if retries:
+                result['retries'] = retries
+            return result
+
         except Exception as e:
-            raise Exception(f"Redirect check failed: {e}")
+            raise self._failure(e, limits)
@@ -0,0 +1,237 @@
+"""
+Compact columnar result archives.
+
+A file is a short header followed by independent chunks, each holding up to
+``chunk_rows`` results stored column by column:
+
+    MAGIC
+    chunk*:  b'CHNK' | rows | meta_len | payload_len | meta (JSON) | payload
+
+The JSON meta carries the chunk's dictionaries (platform, category, status,
+username) and the offset/length of each zlib-compressed column inside the
+payload. Low-cardinality columns are stored as small integer codes into
+those dictionaries, so a reader filtering on status or category can skip a
+chunk from its dictionary alone, and otherwise only has to inflate the code
+columns before deciding whether the rest of the chunk is worth decoding.
+"""
+
+import array
+import json
+import math
+import struct
+import sys
+import zlib
+
+MAGIC = b'SSCOL\x00\x01\n'
+CHUNK_MAGIC = b'CHNK'
+CHUNK_HEADER = struct.Struct('<4sIII')
+
+# (result key, array typecode) for dictionary-encoded columns
+DICT_COLUMNS = (
+    ('platform', 'H'),
+    ('category', 'B'),
+    ('status', 'B'),
+    ('username', 'H'),
+)
+STRING_COLUMNS = ('url', 'error', 'extra')
+KNOWN_KEYS = {'platform', 'category', 'status', 'username', 'url', 'error',
+              'status_code', 'response_time'}
+# Stored in the float column for results without a response_time
+MISSING_TIME = float('nan')
+
+
+def _pack_array(typecode, values):
+    data = array.array(typecode, values)
+    if sys.byteorder == 'big':
+        data.byteswap()
+    return data.tobytes()
+
+
+def _unpack_array(typecode, raw):
+    data = array.array(typecode)
+    data.frombytes(raw)
+    if sys.byteorder == 'big':
+        data.byteswap()
+    return data
+
+
+def _pack_strings(values):
+    encoded = [(v or '').encode('utf-8') for v in values]
+    offsets = [0]
+    for item in encoded:
+        offsets.append(offsets[-1] + len(item))
+    return _pack_array('I', offsets) + b''.join(encoded)
+
+
+def _unpack_strings(raw, rows):
+    offsets_size = (rows + 1) * 4
+    offsets = _unpack_array('I', raw[:offsets_size])
+    blob = raw[offsets_size:]
+    return [blob[offsets[i]:offsets[i + 1]].decode('utf-8') for i in range(rows)]
+
+
+class ColumnarWriter:
+    """Stream results into a columnar archive, one chunk at a time."""
+
+    def __init__(self, filepath, chunk_rows=4096):
+        self.chunk_rows = chunk_rows
+        self.file = open(filepath, 'wb')
+        self.file.write(MAGIC)
+        self.rows_written = 0
+        self.buffer = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def write(self, result):
+        """Buffer a result, writing a chunk once ``chunk_rows`` are pending."""
+        self.buffer.append(result)
+        if len(self.buffer) >= self.chunk_rows:
+            self.flush()
+
+    def write_many(self, results):
+        for result in results:
+            self.write(result)
+
+    def flush(self):
+        """Encode and write the pending rows as one chunk."""
+        if not self.buffer:
+            return
+        rows = self.buffer
+        meta = {'columns': {}}
+        columns = []
+
+        for key, typecode in DICT_COLUMNS:
+            dictionary = {}
+            codes = [dictionary.setdefault(str(r.get(key, '')), len(dictionary)) for r in rows]
+            meta[key] = list(dictionary)
+            columns.append((key, _pack_array(typecode, codes)))
+
+        columns.append(('status_code', _pack_array(
+            'H', [int(r.get('status_code') or 0) for r in rows])))
+        columns.append(('response_time', _pack_array(
+            'f', [MISSING_TIME if r.get('response_time') is None else float(r['response_time'])
+                  for r in rows])))
+        columns.append(('url', _pack_strings([r.get('url') for r in rows])))
+        columns.append(('error', _pack_strings([r.get('error') for r in rows])))
+
+        extras = []
+        for r in rows:
+            extra = {k: v for k, v in r.items() if k not in KNOWN_KEYS}
+            extras.append(json.dumps(extra, ensure_ascii=False) if extra else '')
+        columns.append(('extra', _pack_strings(extras)))
+
+        payload = []
+        offset = 0
+        for name, raw in columns:
+            compressed = zlib.compress(raw, 6)
+            meta['columns'][name] = [offset, len(compressed)]
+            payload.append(compressed)
+            offset += len(compressed)
+
+        meta_bytes = json.dumps(meta, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        self.file.write(CHUNK_HEADER.pack(CHUNK_MAGIC, len(rows), len(meta_bytes), offset))
+        self.file.write(meta_bytes)
+        for compressed in payload:
+            self.file.write(compressed)
+
+        self.rows_written += len(rows)
+        self.buffer = []
+
+    def close(self):
+        if self.file.closed:
+            return
+        self.flush()
+        self.file.close()
+
+
+class ColumnarReader:
+    """Read a columnar archive, decoding only the chunks a filter needs."""
+
+    def __init__(self, filepath):
+        self.filepath = filepath
+
+    @staticmethod
+    def _as_set(value):
+        if value is None:
+            return None
+        if isinstance(value, str):
+            return {value.lower()}
+        return {v.lower() for v in value}
+
+    def _chunks(self, f):
+        """Yield (rows, meta, payload_offset) for every chunk in the file."""
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{self.filepath} is not a columnar results file")
+        while True:
+            header = f.read(CHUNK_HEADER.size)
+            if not header:
+                return
+            if len(header) < CHUNK_HEADER.size:
+                raise ValueError(f"Truncated chunk header in {self.filepath}")
+            magic, rows, meta_len, payload_len = CHUNK_HEADER.unpack(header)
+            if magic != CHUNK_MAGIC:
+                raise ValueError(f"Corrupt chunk in {self.filepath}")
+            meta = json.loads(f.read(meta_len).decode('utf-8'))
+            payload_offset = f.tell()
+            yield rows, meta, payload_offset
+            f.seek(payload_offset + payload_len)
+
+    def iter_results(self, status=None, category=None, platform=None):
+        """
+        Yield result dictionaries matching all given filters.
+
+        Each filter may be a single value or a collection of values and is
+        matched case-insensitively.
+        """
+        filters = {
+            'status': self._as_set(status),
+            'category': self._as_set(category),
+            'platform': self._as_set(platform),
+        }
+        filters = {k: v for k, v in filters.items() if v is not None}
+        typecodes = dict(DICT_COLUMNS)
+
+        with open(self.filepath, 'rb') as f:
+            for rows, meta, payload_offset in self._chunks(f):
+                def column(name):
+                    offset, length = meta['columns'][name]
+                    f.seek(payload_offset + offset)
+                    return zlib.decompress(f.read(length))
+
+                # Translate filters into dictionary codes; skip the chunk
+                # outright if a filter value never occurs in it.
+                wanted_codes = {}
+                for key, values in filters.items():
+                    wanted_codes[key] = {i for i, v in enumerate(meta[key]) if v.lower() in values}
+                if any(not codes for codes in wanted_codes.values()):
+                    continue
+
+                selected = range(rows)
+                for key, codes in wanted_codes.items():
+                    values = _unpack_array(typecodes[key], column(key))
+                    selected = [i for i in selected if values[i] in codes]
+                if not selected:
+                    continue
+
+                decoded = {key: _unpack_array(typecode, column(key))
+                           for key, typecode in DICT_COLUMNS}
+                status_codes = _unpack_array('H', column('status_code'))
+                response_times = _unpack_array('f', column('response_time'))
+                strings = {name: _unpack_strings(column(name), rows) for name in STRING_COLUMNS}
+
+                for i in selected:
+                    result = {key: meta[key][decoded[key][i]] for key, _ in DICT_COLUMNS}
+                    result['url'] = strings['url'][i]
+                    if not math.isnan(response_times[i]):
+                        result['response_time'] = round(response_times[i], 2)
+                    if status_codes[i]:
+                        result['status_code'] = status_codes[i]
+                    if strings['error'][i]:
+                        result['error'] = strings['error'][i]
+                    if strings['extra'][i]:
+                        result.update(json.loads(strings['extra'][i]))
+                    yield result
@@ -0,0 +1,220 @@
+"""
+In-process DNS cache and connection pre-warming.
+
+``DNSCache.install()`` wraps ``socket.getaddrinfo`` for the whole process so
+every HTTP session shares one resolver cache. When dnspython is available
+its answers are used directly and cached for the record TTL; otherwise the
+system resolver is used and entries live for ``default_ttl`` seconds.
+"""
+
+import ipaddress
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+try:
+    import dns.resolver
+    import dns.exception
+    HAS_DNSPYTHON = True
+except ImportError:
+    HAS_DNSPYTHON = False
+
+
+class DNSCache:
+    """Thread-safe getaddrinfo cache with TTL and negative caching."""
+
+    def __init__(self, default_ttl=300, min_ttl=30, max_ttl=3600, negative_ttl=30):
+        self.default_ttl = default_ttl
+        self.min_ttl = min_ttl
+        self.max_ttl = max_ttl
+        self.negative_ttl = negative_ttl
+
+        self.entries = {}
+        self.lock = threading.Lock()
+        self.key_locks = {}
+        self.hits = 0
+        self.misses = 0
+        self._original = None
+        self._resolver = dns.resolver.Resolver() if HAS_DNSPYTHON else None
+
+    def install(self):
+        """Route socket.getaddrinfo through this cache."""
+        if self._original is None:
+            self._original = socket.getaddrinfo
+            socket.getaddrinfo = self.getaddrinfo
+
+    def uninstall(self):
+        if self._original is not None:
+            socket.getaddrinfo = self._original
+            self._original = None
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def _system_getaddrinfo(self, *args, **kwargs):
+        return (self._original or socket.getaddrinfo)(*args, **kwargs)
+
+    def _clamp(self, ttl):
+        return max(self.min_ttl, min(ttl, self.max_ttl))
+
+    def _resolve_dnspython(self, host, port, family, type, proto):
+        """Resolve A/AAAA records, returning (addrinfo list, ttl) or None."""
+        if type not in (0, socket.SOCK_STREAM):
+            return None
+        families = []
+        if family in (0, socket.AF_UNSPEC, socket.AF_INET):
+            families.append((socket.AF_INET, 'A'))
+        if family in (0, socket.AF_UNSPEC, socket.AF_INET6) and socket.has_ipv6:
+            families.append((socket.AF_INET6, 'AAAA'))
+
+        results, ttls = [], []
+        for af, rdtype in families:
+            try:
+                answer = self._resolver.resolve(host, rdtype)
+            except dns.exception.DNSException:
+                continue
+            ttls.append(answer.rrset.ttl)
+            for record in answer:
+                sockaddr = (record.address, port) if af == socket.AF_INET else (record.address, port, 0, 0)
+                results.append((af, socket.SOCK_STREAM, proto or socket.IPPROTO_TCP, '', sockaddr))
+        if not results:
+            return None
+        return results, min(ttls)
+
+    def getaddrinfo(self, host, port, family=0, type=0, proto=0, flags=0):
+        """Drop-in replacement for socket.getaddrinfo."""
+        if not isinstance(host, str) or flags:
+            return self._system_getaddrinfo(host, port, family, type, proto, flags)
+        try:
+            ipaddress.ip_address(host.strip('[]'))
+            return self._system_getaddrinfo(host, port, family, type, proto, flags)
+        except ValueError:
+            pass
+
+        key = (host.lower(), port, family, type, proto)
+        now = time.monotonic()
+        entry = self.entries.get(key)
+        if entry and entry[0] > now:
+            self.hits += 1
+            if isinstance(entry[1], Exception):
+                raise entry[1]
+            return list(entry[1])
+
+        # One lookup per key at a time; concurrent callers wait and reuse it
+        with self.lock:
+            key_lock = self.key_locks.setdefault(key, threading.Lock())
+        with key_lock:
+            entry = self.entries.get(key)
+            if entry and entry[0] > time.monotonic():
+                self.hits += 1
+                if isinstance(entry[1], Exception):
+                    raise entry[1]
+                return list(entry[1])
+
+            self.misses += 1
+            resolved = None
+            if self._resolver is not None:
+                resolved = self._resolve_dnspython(host, port, family, type, proto)
+            try:
+                if resolved:
+                    results, ttl = resolved
+                else:
+                    results, ttl = self._system_getaddrinfo(host, port, family, type, proto), self.default_ttl
+            except socket.gaierror as e:
+                self.entries[key] = (time.monotonic() + self.negative_ttl, e)
+                raise
+            self.entries[key] = (time.monotonic() + self._clamp(ttl), results)
+            return list(results)
+
+
+def _warm_host(session, url, timeout):
+    """Resolve a host and leave one open connection in the session's pool."""
+    parts = urlsplit(url)
+    host = parts.hostname
+    port = parts.port or (443 if parts.scheme == 'https' else 80)
+    report = {'host': host, 'dns_ms': 0.0, 'connect_ms': 0.0, 'error': None}
+
+    try:
+        import requests
+        from urllib3.util.connection import allowed_gai_family
+
+        # Same lookup urllib3 makes, so the probe hits this cache entry
+        start = time.perf_counter()
+        socket.getaddrinfo(host, port, allowed_gai_family(), socket.SOCK_STREAM)
+        report['dns_ms'] = (time.perf_counter() - start) * 1000
+
+        # Behind a proxy the pool belongs to the proxy, not the site
+        if requests.utils.get_environ_proxies(url) or session.proxies:
+            return report
+
+        adapter = session.get_adapter(url)
+        if hasattr(adapter, 'get_connection_with_tls_context'):
+            request = requests.Request('GET', url).prepare()
+            pool = adapter.get_connection_with_tls_context(request, session.verify, cert=session.cert)
+        else:
+            pool = adapter.get_connection(url)
+
+        # Open the TCP (and TLS) connection without sending a request and
+        # hand it back to the pool, where the first probe picks it up. Nothing
+        # reaches the site's HTTP layer, so this costs none of its rate limit
+        # and connect_ms is only the setup the first probe no longer pays.
+        conn = pool._get_conn()
+        try:
+            if getattr(conn, 'sock', None) is None:
+                conn.timeout = timeout
+                start = time.perf_counter()
+                conn.connect()
+                report['connect_ms'] = (time.perf_counter() - start) * 1000
+        except Exception:
+            conn.close()
+            raise
+        finally:
+            pool._put_conn(conn)
+    except Exception as e:
+        report['error'] = str(e)
+    return report
+
+
+def prewarm(targets, max_workers=50, timeout=5):
+    """
+    Resolve and connect to every distinct (session, scheme://host) pair.
+
+    Args:
+        targets: Iterable of (requests.Session, url) pairs
+        max_workers: Concurrent warm-ups
+        timeout: Per-host connect timeout in seconds
+
+    Returns:
+        Report dictionary with per-phase totals. ``warm_ms`` is the summed
+        DNS and TCP/TLS setup time taken off the first probes; ``wall_ms`` is
+        what the pre-warm phase itself took with everything running in
+        parallel.
+    """
+    unique = {}
+    for session, url in targets:
+        parts = urlsplit(url)
+        if parts.scheme in ('http', 'https') and parts.hostname:
+            unique[(id(session), parts.scheme, parts.hostname, parts.port)] = (
+                session, f"{parts.scheme}://{parts.netloc}/")
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        reports = list(executor.map(lambda item: _warm_host(item[0], item[1], timeout),
+                                    unique.values()))
+    wall_ms = (time.perf_counter() - start) * 1000
+
+    dns_ms = sum(r['dns_ms'] for r in reports)
+    connect_ms = sum(r['connect_ms'] for r in reports)
+    return {
+        'hosts': len(reports),
+        'connected': len([r for r in reports if r['connect_ms'] and not r['error']]),
+        'failed': len([r for r in reports if r['error']]),
+        'dns_ms': round(dns_ms, 1),
+        'connect_ms': round(connect_ms, 1),
+        'warm_ms': round(dns_ms + connect_ms, 1),
+        'wall_ms': round(wall_ms, 1),
+        'hosts_detail': reports,
+    }
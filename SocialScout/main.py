@@ -8,9 +8,12 @@ import argparse
 import sys
 import json
 import os
+import time
 from colorama import init, Fore, Style, Back
-from username_checker import UsernameChecker
-from output_handlers import OutputHandler
+from results_store import DEFAULT_STORE
+
+# Heavy modules (requests and the checkers) are imported inside the
+# functions that need them so --help and the listing commands start fast.
 
 # Initialize colorama for cross-platform colored output
 init(autoreset=True)
@@ -37,7 +40,463 @@ def print_logo():
 """
     print(logo)
 
+def watch_main(argv):
+    """Entry point for the `watch` subcommand."""
+    import threading
+    from dns_cache import DNSCache
+    from username_checker import UsernameChecker
+    from utils import setup_logging
+    from watcher import Watcher, ConsoleSink, JsonLinesSink, load_watchlist
+    
+    parser = argparse.ArgumentParser(
+        prog='main.py watch',
+        description="Continuously monitor a watchlist and report status changes",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Watchlist format (one entry per line, # for comments):
+  reserved_handle
+  another_handle GitHub,GitLab
+
+Examples:
+  python main.py watch handles.txt
+  python main.py watch handles.txt --category developer --events changes.jsonl
+  python main.py watch handles.txt --once
+        """
+    )
+    
+    parser.add_argument('watchlist', help='Watchlist file')
+    parser.add_argument('--state', default='watch_state.json',
+                       help='Schedule state file (default: watch_state.json)')
+    parser.add_argument('--events', '-e',
+                       help='Append change events to this file as JSON lines (default: print them)')
+    parser.add_argument('--category', '-c',
+                       help='Filter by platform category for entries without explicit platforms')
+    parser.add_argument('--platforms', '-p', nargs='+',
+                       help='Platforms to watch for entries without explicit platforms')
+    parser.add_argument('--min-interval', type=float, default=300,
+                       help='Shortest recheck interval in seconds (default: 300)')
+    parser.add_argument('--max-interval', type=float, default=86400,
+                       help='Longest recheck interval in seconds (default: 86400)')
+    parser.add_argument('--once', action='store_true',
+                       help='Check whatever is due, then exit')
+    parser.add_argument('--timeout', type=int, default=10,
+                       help='Request timeout in seconds (default: 10)')
+    parser.add_argument('--max-workers', type=int, default=10,
+                       help='Maximum concurrent workers (default: 10)')
+    parser.add_argument('--delay', type=float, default=0.1,
+                       help='Delay between requests in seconds (default: 0.1)')
+    parser.add_argument('--debug', action='store_true',
+                       help='Enable debug mode')
+    
+    args = parser.parse_args(argv)
+    
+    if args.min_interval <= 0 or args.max_interval < args.min_interval:
+        print(f"{Fore.RED}Error: --max-interval must be >= --min-interval > 0{Style.RESET_ALL}")
+        sys.exit(1)
+    
+    setup_logging(args.debug)
+    # Long-running, so share resolver results (honouring TTLs) across checks
+    DNSCache().install()
+    
+    checker = UsernameChecker(
+        timeout=args.timeout,
+        max_workers=args.max_workers,
+        delay=args.delay,
+        debug=args.debug
+    )
+    sink = JsonLinesSink(args.events) if args.events else ConsoleSink()
+    watcher = None
+    
+    try:
+        watcher = Watcher(
+            checker,
+            args.state,
+            sink,
+            min_interval=args.min_interval,
+            max_interval=args.max_interval
+        )
+        count = watcher.sync(load_watchlist(args.watchlist), args.category, args.platforms)
+        if count == 0:
+            print(f"{Fore.RED}Error: Watchlist matched no platforms{Style.RESET_ALL}")
+            sys.exit(1)
+        
+        print(f"{Fore.CYAN}{Style.BRIGHT}👀 Watching {count} username/platform pairs...{Style.RESET_ALL}", flush=True)
+        watcher.run(threading.Event(), once=args.once)
+    except KeyboardInterrupt:
+        print(f"\n{Fore.YELLOW}Watch stopped by user{Style.RESET_ALL}")
+    except Exception as e:
+        print(f"{Fore.RED}Error: {e}{Style.RESET_ALL}")
+        if args.debug:
+            import traceback
+            traceback.print_exc()
+        sys.exit(1)
+    finally:
+        sink.close()
+    
+    if watcher:
+        print(f"{Fore.CYAN}Checks run: {watcher.checks_run}, changes reported: {watcher.events_emitted}{Style.RESET_ALL}")
+
+def read_main(argv):
+    """Entry point for the `read` subcommand (query a columnar archive)."""
+    from columnar import ColumnarReader
+    from output_handlers import OutputHandler
+    
+    parser = argparse.ArgumentParser(
+        prog='main.py read',
+        description="Read results back from a columnar archive",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python main.py read scan.col --status available
+  python main.py read scan.col --category developer gaming --format csv
+        """
+    )
+    
+    parser.add_argument('archive', help='Columnar results file written with --format columnar')
+    parser.add_argument('--status', '-s', nargs='+',
+                       help='Only rows with these statuses (available, taken, unknown, error)')
+    parser.add_argument('--category', '-c', nargs='+',
+                       help='Only rows in these categories')
+    parser.add_argument('--platforms', '-p', nargs='+',
+                       help='Only rows for these platforms')
+    parser.add_argument('--format', '-f', choices=['text', 'csv', 'json'],
+                       default='text', help='Output format (default: text)')
+    
+    args = parser.parse_args(argv)
+    
+    if not sys.stdout.isatty():
+        init(strip=True, convert=False)
+    
+    try:
+        reader = ColumnarReader(args.archive)
+        results = list(reader.iter_results(status=args.status, category=args.category,
+                                           platform=args.platforms))
+    except (OSError, ValueError) as e:
+        print(f"{Fore.RED}Error: {e}{Style.RESET_ALL}")
+        sys.exit(1)
+    
+    OutputHandler().display_results(results, args.format)
+
+def history_main(argv):
+    """Entry point for the `history` subcommand (query the results store)."""
+    from datetime import datetime
+    from results_store import ResultStore, parse_since
+    
+    parser = argparse.ArgumentParser(
+        prog='main.py history',
+        description="Query results recorded with --store across runs",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python main.py history --became available --platforms GitHub --since 7d
+  python main.py history --username josh123 --latest
+  python main.py history --status taken --since 24h --format csv
+        """
+    )
+    
+    parser.add_argument('--db', default=DEFAULT_STORE,
+                       help=f'Store path or postgresql:// URL (default: {DEFAULT_STORE})')
+    parser.add_argument('--username', '-u', help='Only this username')
+    parser.add_argument('--platforms', '-p', nargs='+', help='Only these platforms')
+    parser.add_argument('--status', '-s', help='Only results with this status')
+    parser.add_argument('--since', help='Time window, e.g. 30m, 24h, 7d or an ISO date')
+    query = parser.add_mutually_exclusive_group()
+    query.add_argument('--became', choices=['available', 'taken'],
+                       help='Show pairs whose status changed to this value')
+    query.add_argument('--latest', action='store_true',
+                       help='Show only the latest result per username/platform')
+    parser.add_argument('--limit', type=int, default=100,
+                       help='Maximum rows to show (default: 100)')
+    parser.add_argument('--format', '-f', choices=['text', 'csv', 'json'],
+                       default='text', help='Output format (default: text)')
+    
+    args = parser.parse_args(argv)
+    
+    if not sys.stdout.isatty():
+        init(strip=True, convert=False)
+    
+    try:
+        since = parse_since(args.since)
+        with ResultStore(args.db) as store:
+            if args.became:
+                rows = store.transitions(args.became, args.username, args.platforms, since, args.limit)
+            elif args.latest:
+                rows = store.latest(args.username, args.platforms, args.status, args.limit)
+            else:
+                rows = store.history(args.username, args.platforms, args.status, since, args.limit)
+    except Exception as e:
+        print(f"{Fore.RED}Error: {e}{Style.RESET_ALL}")
+        sys.exit(1)
+    
+    for row in rows:
+        row['checked_at'] = datetime.fromtimestamp(row['checked_at']).isoformat(timespec='seconds')
+    
+    if args.format == 'json':
+        print(json.dumps(rows, indent=2, ensure_ascii=False))
+        return
+    if args.format == 'csv':
+        import csv
+        if rows:
+            writer = csv.DictWriter(sys.stdout, fieldnames=list(rows[0]), lineterminator='\n')
+            writer.writeheader()
+            writer.writerows(rows)
+        return
+    
+    if not rows:
+        print(f"{Fore.YELLOW}{Style.BRIGHT}📭 No matching history.{Style.RESET_ALL}")
+        return
+    for row in rows:
+        status = row['status']
+        if status == 'available':
+            status_color = Fore.GREEN + Style.BRIGHT
+        elif status == 'taken':
+            status_color = Fore.RED + Style.BRIGHT
+        else:
+            status_color = Fore.YELLOW + Style.BRIGHT
+        change = f"{row['previous_status']} → " if 'previous_status' in row else ''
+        print(f"  {Fore.CYAN}{row['checked_at']}{Style.RESET_ALL} "
+              f"{Fore.WHITE}{Style.BRIGHT}{row['username']:<20} {row['platform']:<22}{Style.RESET_ALL} "
+              f"{change}{status_color}{status.upper()}{Style.RESET_ALL} "
+              f"{Fore.CYAN}{Style.DIM}{row.get('url') or ''}{Style.RESET_ALL}")
+
+def coordinator_main(argv):
+    """Entry point for the `coordinator` subcommand (fill a work queue, gather results)."""
+    from username_checker import UsernameChecker
+    from utils import setup_logging
+    from output_handlers import OutputHandler
+    from watcher import load_watchlist
+    from work_queue import DEFAULT_QUEUE, open_queue, plan_tasks
+    
+    parser = argparse.ArgumentParser(
+        prog='main.py coordinator',
+        description="Split scans into (username, platform) tasks on a shared work queue",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=f"""
+Queues are SQLite files ({DEFAULT_QUEUE} by default) or redis:// URLs.
+Start any number of workers against the same queue:
+  python main.py worker --queue scan_queue.db
+
+Examples:
+  python main.py coordinator --usernames josh123 josh_dev --category developer
+  python main.py coordinator handles.txt --queue redis://queue-host:6379/0 --wait --output scan.json --format json
+  python main.py coordinator --wait            (just wait for and show the results)
+        """
+    )
+    
+    parser.add_argument('watchlist', nargs='?',
+                       help='File of usernames, one per line (same format as watch mode)')
+    parser.add_argument('--usernames', '-u', nargs='+', default=[],
+                       help='Usernames to enqueue')
+    parser.add_argument('--queue', '-q', default=DEFAULT_QUEUE,
+                       help=f'Queue file or redis:// URL (default: {DEFAULT_QUEUE})')
+    parser.add_argument('--category', '-c',
+                       help='Filter by platform category for entries without explicit platforms')
+    parser.add_argument('--platforms', '-p', nargs='+',
+                       help='Platforms for entries without explicit platforms')
+    parser.add_argument('--wait', action='store_true',
+                       help='Wait until every task is finished, then show the results')
+    parser.add_argument('--output', '-o', help='Save the results to this file (with --wait)')
+    parser.add_argument('--format', '-f', choices=['text', 'csv', 'json'],
+                       default='text', help='Output format (default: text)')
+    
+    args = parser.parse_args(argv)
+    
+    if not sys.stdout.isatty():
+        init(strip=True, convert=False)
+    
+    setup_logging()
+    try:
+        watchlist = load_watchlist(args.watchlist) if args.watchlist else []
+        watchlist += [(username, None) for username in args.usernames]
+        queue = open_queue(args.queue)
+    except Exception as e:
+        print(f"{Fore.RED}Error: {e}{Style.RESET_ALL}")
+        sys.exit(1)
+    
+    with queue:
+        if watchlist:
+            tasks = plan_tasks(UsernameChecker(), watchlist, args.category, args.platforms)
+            added = queue.enqueue(tasks)
+            print(f"{Fore.CYAN}{Style.BRIGHT}📥 Queued {added} tasks{Style.RESET_ALL}"
+                  f"{Fore.CYAN} ({len(tasks) - added} already queued) on {args.queue}{Style.RESET_ALL}")
+        
+        stats = queue.stats()
+        try:
+            while args.wait and (stats['pending'] or stats['leased'] or stats['expired']):
+                print(f"\r{Fore.CYAN}⏳ {stats['done']}/{stats['total']} done, {stats['leased']} leased, "
+                      f"{stats['pending'] + stats['expired']} waiting{Style.RESET_ALL}   ",
+                      end='', flush=True)
+                time.sleep(1)
+                stats = queue.stats()
+        except KeyboardInterrupt:
+            print(f"\n{Fore.YELLOW}Stopped waiting; workers keep going{Style.RESET_ALL}")
+            return
+        
+        print(f"\r{Fore.WHITE}Tasks: {stats['total']}  done: {stats['done']}  leased: {stats['leased']}  "
+              f"waiting: {stats['pending'] + stats['expired']}  failed: {stats['failed']}{Style.RESET_ALL}   ")
+        if not args.wait:
+            return
+        results = queue.results()
+    
+    output_handler = OutputHandler()
+    if args.output:
+        output_handler.save_to_file(results, args.output, args.format)
+        print(f"{Fore.GREEN}Results saved to {args.output}{Style.RESET_ALL}")
+    else:
+        output_handler.display_results(results, args.format)
+
+def worker_main(argv):
+    """Entry point for the `worker` subcommand (execute tasks from a work queue)."""
+    import threading
+    from dns_cache import DNSCache
+    from username_checker import UsernameChecker
+    from utils import setup_logging
+    from work_queue import DEFAULT_QUEUE, DEFAULT_LEASE_SECONDS, QueueWorker, open_queue
+    
+    parser = argparse.ArgumentParser(
+        prog='main.py worker',
+        description="Lease tasks from a work queue, check them and push the results back",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python main.py worker
+  python main.py worker --queue redis://queue-host:6379/0 --max-workers 20
+  python main.py worker --exit-when-empty --host-interval 2
+        """
+    )
+    
+    parser.add_argument('--queue', '-q', default=DEFAULT_QUEUE,
+                       help=f'Queue file or redis:// URL (default: {DEFAULT_QUEUE})')
+    parser.add_argument('--worker-id', help='Name reported with results (default: host-pid)')
+    parser.add_argument('--max-workers', type=int, default=10,
+                       help='Concurrent checks in this worker (default: 10)')
+    parser.add_argument('--batch', type=int,
+                       help='Tasks per lease (default: --max-workers)')
+    parser.add_argument('--lease', type=float, default=DEFAULT_LEASE_SECONDS,
+                       help=f'Lease length in seconds before a task is handed to another worker '
+                            f'(default: {DEFAULT_LEASE_SECONDS})')
+    parser.add_argument('--host-interval', type=float, default=1.0,
+                       help='Minimum seconds between requests to one host across all workers (default: 1.0)')
+    parser.add_argument('--exit-when-empty', action='store_true',
+                       help='Exit once the queue has no pending or leased tasks')
+    parser.add_argument('--timeout', type=int, default=10,
+                       help='Request timeout in seconds (default: 10)')
+    parser.add_argument('--delay', type=float, default=0,
+                       help='Extra delay between requests from this worker (default: 0)')
+    parser.add_argument('--verbose', '-v', action='store_true',
+                       help='Print every result')
+    parser.add_argument('--debug', action='store_true',
+                       help='Enable debug mode')
+    
+    args = parser.parse_args(argv)
+    
+    if not sys.stdout.isatty():
+        init(strip=True, convert=False)
+    
+    setup_logging(args.debug)
+    DNSCache().install()
+    
+    def show(result):
+        if args.verbose:
+            print(f"  {result['username']:<20} {result['platform']:<22} {result['status']}", flush=True)
+    
+    worker = None
+    try:
+        checker = UsernameChecker(
+            timeout=args.timeout,
+            max_workers=args.max_workers,
+            delay=args.delay,
+            debug=args.debug
+        )
+        with open_queue(args.queue) as queue:
+            worker = QueueWorker(queue, checker, args.worker_id, args.batch, args.lease, args.host_interval)
+            print(f"{Fore.CYAN}{Style.BRIGHT}🛠️  Worker {worker.worker_id} pulling from {args.queue}{Style.RESET_ALL}",
+                  flush=True)
+            worker.run(threading.Event(), exit_when_empty=args.exit_when_empty, on_result=show)
+    except KeyboardInterrupt:
+        print(f"\n{Fore.YELLOW}Worker stopped by user; unfinished leases will expire{Style.RESET_ALL}")
+    except Exception as e:
+        print(f"{Fore.RED}Error: {e}{Style.RESET_ALL}")
+        if args.debug:
+            import traceback
+            traceback.print_exc()
+        sys.exit(1)
+    
+    if worker:
+        print(f"{Fore.CYAN}Tasks completed: {worker.completed}, duplicates ignored: {worker.duplicates}, "
+              f"failed (left to lease expiry): {worker.failed}{Style.RESET_ALL}")
+
+def list_catalog(args):
+    """Serve --list-platforms / --list-categories straight from the catalog."""
+    import catalog
+    
+    if args.no_color or not sys.stdout.isatty():
+        init(strip=True, convert=False)
+    
+    if args.list_categories:
+        counts = catalog.get_category_counts()
+        for category in catalog.get_categories():
+            print(f"{Fore.CYAN}{category:<20}{Style.RESET_ALL} {counts[category]:>4}")
+        return
+    
+    platforms = catalog.load_platforms()
+    for name in catalog.get_platform_names():
+        category = platforms[name].get('category', 'unknown')
+        if args.category and category.lower() != args.category.lower():
+            continue
+        print(f"{Fore.WHITE}{Style.BRIGHT}{name:<28}{Style.RESET_ALL} {Fore.CYAN}{category}{Style.RESET_ALL}")
+
+def print_replay_report(cassette, results, cpu_time, wall_time):
+    """Show per-result cost and any classification drift against the recording."""
+    from cassette import compare_results
+    
+    count = max(len(results), 1)
+    print(f"\n{Fore.CYAN}{Style.BRIGHT}🧪 REPLAY BENCHMARK{Style.RESET_ALL}")
+    print(f"{Fore.WHITE}Results: {len(results)}  Wall: {wall_time * 1000:.0f}ms  "
+          f"CPU: {cpu_time * 1000:.0f}ms ({cpu_time * 1000 / count:.2f}ms/result){Style.RESET_ALL}")
+    
+    recorded = cassette.load_results()
+    if not recorded:
+        print(f"{Fore.YELLOW}No recorded results to compare against{Style.RESET_ALL}")
+        return
+    changes = compare_results(recorded, results)
+    if not changes:
+        print(f"{Fore.GREEN}{Style.BRIGHT}✅ All classifications match the recording{Style.RESET_ALL}")
+        return
+    print(f"{Fore.RED}{Style.BRIGHT}⚠️  {len(changes)} classification(s) differ from the recording:{Style.RESET_ALL}")
+    for username, platform, before, after in changes:
+        print(f"  {platform:<22} {username:<20} {before} → {Fore.YELLOW}{after}{Style.RESET_ALL}")
+
+def print_profile_report(summary, directory):
+    """Show where scan time went, by phase and checker type."""
+    from profiler import PHASES
+    
+    overall = summary['overall']
+    busy = sum(overall.get(phase, 0.0) for phase in PHASES) or 1
+    print(f"\n{Fore.CYAN}{Style.BRIGHT}🔬 PROFILE ({summary['samples']} samples, "
+          f"{summary['wall_time'] * 1000:.0f}ms wall){Style.RESET_ALL}")
+    for phase in sorted(PHASES, key=lambda p: -overall.get(p, 0.0)):
+        seconds = overall.get(phase, 0.0)
+        if seconds:
+            print(f"  {phase:<18} {seconds * 1000:>10.1f}ms  {seconds / busy * 100:>5.1f}%")
+    for checker_type, totals in sorted(summary['by_checker_type'].items()):
+        if checker_type != '-':
+            print(f"  {Fore.WHITE}{checker_type:<18} {totals.get('total', 0.0) * 1000:>10.1f}ms total{Style.RESET_ALL}")
+    print(f"{Fore.GREEN}Profile written to {directory} (stacks.folded, phases.txt, phases.json){Style.RESET_ALL}")
+
+SUBCOMMANDS = {
+    'watch': watch_main,
+    'read': read_main,
+    'history': history_main,
+    'coordinator': coordinator_main,
+    'worker': worker_main,
+}
+
 def main():
+    if len(sys.argv) > 1 and sys.argv[1] in SUBCOMMANDS:
+        SUBCOMMANDS[sys.argv[1]](sys.argv[2:])
+        return
+    
     parser = argparse.ArgumentParser(
         description="Check username availability across 100+ websites",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -48,10 +507,26 @@ Examples:
   python main.py username123 --available-only
   python main.py username123 --output results.json --format json
   python main.py username123 --timeout 10 --max-workers 20
+  python main.py username123 --deadline 15
+  python main.py --list-categories
+  python main.py --list-platforms --category developer
+  python main.py username123 --output scan.col --format columnar
+  python main.py watch handles.txt          (see: python main.py watch --help)
+  python main.py coordinator -u josh123     (then: python main.py worker, on any number of machines)
+  python main.py read scan.col --status available
+  python main.py username123 --record cassettes/run1   (then: --replay cassettes/run1)
+  python main.py username123 --profile profile/
+  python main.py username123 --store        (then: python main.py history --help)
         """
     )
     
-    parser.add_argument('username', help='Username to check availability for')
+    parser.add_argument('username', nargs='?', help='Username to check availability for')
+    
+    # Catalog listing (no network access, no HTTP stack loaded)
+    parser.add_argument('--list-platforms', action='store_true',
+                       help='List supported platforms (combine with --category to narrow) and exit')
+    parser.add_argument('--list-categories', action='store_true',
+                       help='List platform categories with platform counts and exit')
     
     # Filtering options
     parser.add_argument('--category', '-c', 
@@ -66,10 +541,13 @@ Examples:
     # Output options
     parser.add_argument('--output', '-o', 
                        help='Output file path')
-    parser.add_argument('--format', '-f', choices=['text', 'csv', 'json'],
-                       default='text', help='Output format (default: text)')
+    parser.add_argument('--format', '-f', choices=['text', 'csv', 'json', 'columnar'],
+                       default='text', help='Output format (default: text; columnar requires --output)')
     parser.add_argument('--no-color', action='store_true',
                        help='Disable colored output')
+    parser.add_argument('--store', nargs='?', const=DEFAULT_STORE, metavar='DB',
+                       help=f'Also record results in a history store (default: {DEFAULT_STORE}; '
+                            'accepts a postgresql:// URL)')
     
     # Performance options
     parser.add_argument('--timeout', type=int, default=10,
@@ -78,6 +556,33 @@ Examples:
                        help='Maximum concurrent workers (default: 50)')
     parser.add_argument('--delay', type=float, default=0.1,
                        help='Delay between requests in seconds (default: 0.1)')
+    parser.add_argument('--prewarm', action='store_true',
+                       help='Resolve and open connections to all selected hosts before checking')
+    parser.add_argument('--dns-ttl', type=int, default=300,
+                       help='DNS cache lifetime in seconds (default: 300). Record TTLs are only '
+                            'honoured when dnspython is installed; otherwise every entry lives this long')
+    parser.add_argument('--no-dns-cache', action='store_true',
+                       help='Disable the in-process DNS cache')
+    parser.add_argument('--deadline', type=float, metavar='SECONDS',
+                       help='Stop after this many seconds and report unfinished platforms as timeout')
+    parser.add_argument('--retries', type=int, default=2,
+                       help='Retries for connection errors, timeouts, 429 and 5xx (default: 2)')
+    parser.add_argument('--retry-budget', type=float, default=0.2,
+                       help='Retries allowed per request across the whole scan (default: 0.2)')
+    
+    # Record/replay options
+    parser.add_argument('--record', metavar='DIR',
+                       help='Record every HTTP exchange and result into a cassette directory')
+    parser.add_argument('--replay', metavar='DIR',
+                       help='Serve HTTP from a recorded cassette instead of the network')
+    parser.add_argument('--replay-latency', action='store_true',
+                       help='Replay with the recorded response times instead of at full speed')
+    
+    # Profiling options
+    parser.add_argument('--profile', metavar='DIR',
+                       help='Sample stacks and time each phase; write stacks.folded and phase reports to DIR')
+    parser.add_argument('--profile-interval', type=float, default=5,
+                       help='Stack sampling interval in milliseconds (default: 5)')
     
     # Debugging options
     parser.add_argument('--verbose', '-v', action='store_true',
@@ -97,10 +602,26 @@ Examples:
     
     args = parser.parse_args()
     
+    if args.list_platforms or args.list_categories:
+        list_catalog(args)
+        return
+    
+    if not args.username:
+        parser.error('the following arguments are required: username')
+    
     # Validate arguments
     if args.available_only and args.taken_only:
         print(f"{Fore.RED}Error: Cannot use --available-only and --taken-only together{Style.RESET_ALL}")
         sys.exit(1)
+    if args.format == 'columnar' and not args.output:
+        print(f"{Fore.RED}Error: --format columnar requires --output{Style.RESET_ALL}")
+        sys.exit(1)
+    if args.record and args.replay:
+        print(f"{Fore.RED}Error: Cannot use --record and --replay together{Style.RESET_ALL}")
+        sys.exit(1)
+    if args.replay and args.prewarm:
+        print(f"{Fore.RED}Error: --prewarm has nothing to warm up when using --replay{Style.RESET_ALL}")
+        sys.exit(1)
     
     # Disable color if requested or if output is redirected
     if args.no_color or not sys.stdout.isatty():
@@ -111,38 +632,131 @@ Examples:
         if not args.no_color and sys.stdout.isatty():
             print_logo()
         
+        from username_checker import ScanInterrupted, UsernameChecker
+        from utils import setup_logging
+        from output_handlers import OutputHandler
+        from columnar import ColumnarWriter
+        from results_store import ResultStore
+        
+        if not args.no_dns_cache and not args.replay:
+            from dns_cache import DNSCache
+            DNSCache(default_ttl=args.dns_ttl).install()
+        
+        cassette = transport = None
+        if args.record or args.replay:
+            from cassette import Cassette, CassetteTransport
+            if args.record:
+                cassette = Cassette(args.record)
+                cassette.start_recording()
+                transport = CassetteTransport(cassette, 'record')
+            else:
+                cassette = Cassette(args.replay).load()
+                transport = CassetteTransport(cassette, 'replay', realtime=args.replay_latency)
+        
+        setup_logging(args.debug)
+        from retry import RetryPolicy, RetryBudget
+        retry_policy = RetryPolicy(max_retries=args.retries, budget=RetryBudget(args.retry_budget))
+        
         # Initialize checker
         checker = UsernameChecker(
             timeout=args.timeout,
             max_workers=args.max_workers,
-            delay=args.delay,
+            # Nothing to be polite to when replaying at full speed
+            delay=0 if (args.replay and not args.replay_latency) else args.delay,
             verbose=args.verbose,
-            debug=args.debug
+            debug=args.debug,
+            transport=transport,
+            retry_policy=retry_policy
         )
+        if args.record:
+            # Record at least as much of each body as its platform's rules may read
+            cassette.max_body_bytes = max([cassette.max_body_bytes] + [
+                config.get('max_body_bytes', 0) for config in checker.platforms.values()])
         
         # Print search info
         print(f"{Fore.CYAN}{Style.BRIGHT}🔍 Checking username '{Fore.YELLOW}{args.username}{Fore.CYAN}' across platforms...{Style.RESET_ALL}\n")
         
-        results = checker.check_username(
-            username=args.username,
-            category=args.category,
-            platforms=args.platforms
-        )
+        platforms_to_check = checker.select_platforms(args.category, args.platforms)
+        print(f"{Fore.CYAN}{Style.BRIGHT}🔍 Scanning {len(platforms_to_check)} platforms...{Style.RESET_ALL}")
+        if args.category:
+            print(f"{Fore.MAGENTA}📂 Category filter: {Style.BRIGHT}{args.category}{Style.RESET_ALL}")
+        if args.platforms:
+            print(f"{Fore.MAGENTA}🎯 Platform filter: {Style.BRIGHT}{', '.join(args.platforms)}{Style.RESET_ALL}")
+        if args.prewarm:
+            report = checker.prewarm_hosts(platforms_to_check, args.username)
+            print(f"{Fore.MAGENTA}🔥 Pre-warmed {report['connected']}/{report['hosts']} hosts in "
+                  f"{Style.BRIGHT}{report['wall_ms']:.0f}ms{Style.RESET_ALL}{Fore.MAGENTA} "
+                  f"({report['warm_ms']:.0f}ms of DNS, TCP and TLS setup taken off the first probes){Style.RESET_ALL}")
+        print()
+        
+        def wanted(result):
+            if args.available_only:
+                return result['status'] == 'available'
+            if args.taken_only:
+                return result['status'] == 'taken'
+            return True
+        
+        # Columnar archives are written chunk by chunk as results arrive;
+        # the history store records every result regardless of filters
+        stream_writer = ColumnarWriter(args.output) if args.format == 'columnar' else None
+        store = ResultStore(args.store) if args.store else None
+        
+        recording = cassette if args.record else None
+        
+        def on_result(result):
+            if stream_writer and wanted(result):
+                stream_writer.write(result)
+            if store:
+                store.add(result)
+            if recording:
+                recording.record_result(result)
+        
+        profile = None
+        if args.profile:
+            from profiler import Profiler
+            profile = Profiler(interval=args.profile_interval / 1000).start()
+        
+        cpu_start, wall_start = time.process_time(), time.perf_counter()
+        interrupted = False
+        try:
+            results = checker.check_username(
+                username=args.username,
+                category=args.category,
+                platforms=args.platforms,
+                on_result=on_result if (stream_writer or store or recording) else None,
+                deadline=args.deadline
+            )
+        except ScanInterrupted as e:
+            # Report what finished; unfinished platforms are 'timeout' rows
+            results = e.results
+            interrupted = True
+        finally:
+            if stream_writer:
+                stream_writer.close()
+            if store:
+                store.close()
+            if recording:
+                recording.close()
+        cpu_time, wall_time = time.process_time() - cpu_start, time.perf_counter() - wall_start
+        all_results = results
         
         # Filter results if requested
-        if args.available_only:
-            results = [r for r in results if r['status'] == 'available']
-        elif args.taken_only:
-            results = [r for r in results if r['status'] == 'taken']
+        results = [r for r in results if wanted(r)]
         
         # Output results
         output_handler = OutputHandler()
         
-        if args.output:
+        output_start = time.perf_counter()
+        if stream_writer:
+            print(f"\n{Fore.GREEN}Results saved to {args.output}{Style.RESET_ALL}")
+        elif args.output:
             output_handler.save_to_file(results, args.output, args.format)
             print(f"\n{Fore.GREEN}Results saved to {args.output}{Style.RESET_ALL}")
         else:
             output_handler.display_results(results, args.format)
+        if profile:
+            profile.add('output', time.perf_counter() - output_start)
+            profile.stop()
         
         # Enhanced Summary
         total = len(results)
@@ -150,6 +764,7 @@ Examples:
         taken = len([r for r in results if r['status'] == 'taken'])
         errors = len([r for r in results if r['status'] == 'error'])
         unknown = len([r for r in results if r['status'] == 'unknown'])
+        timeouts = len([r for r in results if r['status'] == 'timeout'])
         
         print(f"\n{Fore.CYAN}{Style.BRIGHT}{'='*60}")
         print(f"📊 SUMMARY FOR '{args.username}'")
@@ -159,11 +774,32 @@ Examples:
         print(f"{Fore.RED}{Style.BRIGHT}❌ Taken: {taken}{Style.RESET_ALL}")
         if unknown > 0:
             print(f"{Fore.YELLOW}{Style.BRIGHT}❓ Unknown: {unknown}{Style.RESET_ALL}")
+        if timeouts > 0:
+            print(f"{Fore.MAGENTA}{Style.BRIGHT}⏱️  Not finished: {timeouts}{Style.RESET_ALL}")
         
         # Don't show errors in summary unless debug mode
         if errors > 0 and args.debug:
             print(f"{Fore.MAGENTA}{Style.BRIGHT}⚠️  Errors: {errors}{Style.RESET_ALL}")
         
+        # Retries across all checked platforms, not just the displayed ones
+        retried = [r for r in all_results if r.get('retries')]
+        if retried:
+            retry_count = sum(r['retries'] for r in retried)
+            print(f"{Fore.BLUE}🔁 Retries: {Style.BRIGHT}{retry_count}{Style.RESET_ALL}{Fore.BLUE} "
+                  f"across {len(retried)} platforms{Style.RESET_ALL}")
+            if args.verbose:
+                for r in sorted(retried, key=lambda r: (-r['retries'], r['platform'].lower())):
+                    print(f"   {r['platform']:<22} {r['retries']}  ({r['status']})")
+        transfer = checker.transfer_totals()
+        if transfer['responses']:
+            print(f"{Fore.BLUE}📦 Transferred: {Style.BRIGHT}{transfer['wire_bytes'] / 1024:.1f} KiB"
+                  f"{Style.RESET_ALL}{Fore.BLUE} on the wire, {transfer['decoded_bytes'] / 1024:.1f} KiB "
+                  f"decoded over {transfer['responses']} responses{Style.RESET_ALL}")
+            if transfer['capped'] and args.verbose:
+                print(f"   {transfer['capped']} bodies stopped at their max_body_bytes limit")
+        if retry_policy.budget.denied:
+            print(f"{Fore.YELLOW}⏳ Retry budget exhausted: {retry_policy.budget.denied} retries skipped{Style.RESET_ALL}")
+        
         # Availability percentage
         if total > 0:
             availability_rate = (available / total) * 100
@@ -171,6 +807,17 @@ Examples:
         
         print(f"{Fore.CYAN}{Style.BRIGHT}{'='*60}{Style.RESET_ALL}")
         
+        if profile:
+            print_profile_report(profile.write(args.profile), args.profile)
+        if args.record:
+            print(f"\n{Fore.GREEN}🎞️  Recorded {len(all_results)} checks to {args.record}{Style.RESET_ALL}")
+        if args.replay:
+            print_replay_report(cassette, all_results, cpu_time, wall_time)
+        
+        if interrupted:
+            print(f"\n{Fore.YELLOW}Check interrupted by user; partial results shown{Style.RESET_ALL}")
+            sys.exit(1)
+        
     except KeyboardInterrupt:
         print(f"\n{Fore.YELLOW}Check interrupted by user{Style.RESET_ALL}")
         sys.exit(1)
@@ -1,12 +1,14 @@
 """
-Output handlers for different formats (text, CSV, JSON).
+Output handlers for different formats (text, CSV, JSON, columnar).
 """
 
 import json
 import csv
 import os
+import sys
 from datetime import datetime
 from colorama import Fore, Style
+from columnar import ColumnarWriter
 
 class OutputHandler:
     """Handles different output formats for results."""
@@ -19,6 +21,8 @@ class OutputHandler:
             self._display_csv(results)
         elif format_type == 'json':
             self._display_json(results)
+        elif format_type == 'columnar':
+            raise ValueError("Columnar format is binary; use --output to write it to a file")
     
     def save_to_file(self, results, filepath, format_type='text'):
         """Save results to a file in the specified format."""
@@ -28,6 +32,8 @@ class OutputHandler:
             self._save_csv(results, filepath)
         elif format_type == 'json':
             self._save_json(results, filepath)
+        elif format_type == 'columnar':
+            self._save_columnar(results, filepath)
     
     def _display_text(self, results):
         """Display results in enhanced formatted text."""
@@ -90,6 +96,10 @@ class OutputHandler:
                     status_color = Fore.RED + Style.BRIGHT
                     status_symbol = "❌"
                     status_text = f"{Fore.RED + Style.BRIGHT}TAKEN{Style.RESET_ALL}"
+                elif status == 'timeout':
+                    status_color = Fore.MAGENTA + Style.BRIGHT
+                    status_symbol = "⏱️"
+                    status_text = f"{Fore.MAGENTA + Style.BRIGHT}TIMEOUT{Style.RESET_ALL}"
                 else:
                     status_color = Fore.YELLOW + Style.BRIGHT
                     status_symbol = "❓"
@@ -115,15 +125,18 @@ class OutputHandler:
             print("No results found.")
             return
         
+        writer = csv.writer(sys.stdout, lineterminator='\n')
+        
         # Print CSV header
-        print("Platform,Username,Status,URL,Category,Response Time (ms),Status Code,Error")
+        writer.writerow(['Platform', 'Username', 'Status', 'URL', 'Category',
+                         'Response Time (ms)', 'Status Code', 'Error'])
         
         # Print CSV rows
         for result in results:
-            print(f"{result['platform']},{result['username']},{result['status']},{result['url']},"
-                  f"{result.get('category', '')},"
-                  f"{result.get('response_time', 0)},{result.get('status_code', '')},"
-                  f"\"{result.get('error', '')}\"")
+            writer.writerow([result['platform'], result['username'], result['status'], result['url'],
+                             result.get('category', ''),
+                             result.get('response_time', 0), result.get('status_code', ''),
+                             result.get('error', '')])
     
     def _display_json(self, results):
         """Display results in JSON format."""
@@ -202,6 +215,11 @@ class OutputHandler:
         with open(filepath, 'w', encoding='utf-8') as f:
             json.dump(output, f, indent=2, ensure_ascii=False)
     
+    def _save_columnar(self, results, filepath):
+        """Save results to a columnar archive."""
+        with ColumnarWriter(filepath) as writer:
+            writer.write_many(results)
+    
     def _get_summary(self, results):
         """Generate summary statistics."""
         total = len(results)
@@ -209,14 +227,16 @@ class OutputHandler:
         taken = len([r for r in results if r['status'] == 'taken'])
         errors = len([r for r in results if r['status'] == 'error'])
         unknown = len([r for r in results if r['status'] == 'unknown'])
+        timeouts = len([r for r in results if r['status'] == 'timeout'])
         
         # Category breakdown
         categories = {}
         for result in results:
             category = result.get('category', 'unknown')
             if category not in categories:
-                categories[category] = {'available': 0, 'taken': 0, 'error': 0, 'unknown': 0}
-            categories[category][result['status']] += 1
+                categories[category] = {'available': 0, 'taken': 0, 'error': 0, 'unknown': 0, 'timeout': 0}
+            counts = categories[category]
+            counts[result['status']] = counts.get(result['status'], 0) + 1
         
         return {
             'total_platforms': total,
@@ -224,5 +244,6 @@ class OutputHandler:
             'taken': taken,
             'errors': errors,
             'unknown': unknown,
+            'timeouts': timeouts,
             'categories': categories
         }
@@ -0,0 +1,197 @@
+"""
+Sampling profiler and per-phase timing for ``--profile``.
+
+While a ``Profiler`` is active, a background thread samples every other
+thread's stack with ``sys._current_frames()`` and the engine reports how long
+each probe spends in each phase:
+
+    rate_limit_lock   waiting to acquire the RateLimiter lock
+    rate_limit_sleep  sleeping inside the RateLimiter to keep the delay
+    network           sending the request until the response headers arrive
+    retry_backoff     sleeping between retries
+    body              downloading and decompressing the body
+    rules             matching detection rules against the body
+    output            formatting and writing results (not tied to a platform)
+
+``write()`` saves ``stacks.folded`` (collapsed stacks, one ``a;b;c count``
+line each, ready for flamegraph.pl or speedscope), ``phases.json`` and a
+readable ``phases.txt`` with totals per platform and per checker type.
+
+Hooks call the module-level ``record()``/``timed()``, which do nothing unless
+a profiler has been started, so the engine pays one global lookup per hook
+when profiling is off.
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+PHASES = ('rate_limit_lock', 'rate_limit_sleep', 'network', 'retry_backoff', 'body', 'rules', 'output')
+SCAN_KEY = ('(scan)', '-')
+
+_active = None
+
+
+def record(phase, seconds):
+    """Add time to a phase of the current thread's platform, if profiling."""
+    profiler = _active
+    if profiler is not None:
+        profiler.add(phase, seconds)
+
+
+@contextmanager
+def timed(phase):
+    if _active is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(phase, time.perf_counter() - start)
+
+
+@contextmanager
+def platform(platform_name, checker_type):
+    """Attribute phases recorded by this thread to a platform while inside."""
+    profiler = _active
+    if profiler is None:
+        yield
+        return
+    previous = getattr(profiler.local, 'key', None)
+    profiler.local.key = (platform_name, checker_type)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        profiler.add('total', time.perf_counter() - start)
+        profiler.local.key = previous
+
+
+def _frame_label(frame):
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class Profiler:
+    """Stack sampler plus phase accounting; use as a context manager or start()/stop()."""
+
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        self.phases = {}
+        self.stacks = {}
+        self.samples = 0
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.wall_time = 0.0
+        self._start = None
+
+    def start(self):
+        global _active
+        _active = self
+        self._start = time.perf_counter()
+        self.thread = threading.Thread(target=self._sample, name='profiler', daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        global _active
+        if _active is self:
+            _active = None
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+        self.wall_time = time.perf_counter() - self._start
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def add(self, phase, seconds):
+        key = getattr(self.local, 'key', None) or SCAN_KEY
+        with self.lock:
+            totals = self.phases.setdefault(key, {})
+            totals[phase] = totals.get(phase, 0.0) + seconds
+
+    def _sample(self):
+        own = threading.get_ident()
+        names = {}
+        while not self.stop_event.wait(self.interval):
+            for thread in threading.enumerate():
+                names[thread.ident] = thread.name
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_label(frame))
+                    frame = frame.f_back
+                stack.append(names.get(ident, f"thread-{ident}").split('_')[0])
+                key = ';'.join(reversed(stack))
+                self.stacks[key] = self.stacks.get(key, 0) + 1
+            self.samples += 1
+
+    def summary(self):
+        """Phase seconds per platform and per checker type, plus overall totals."""
+        with self.lock:
+            phases = {key: dict(totals) for key, totals in self.phases.items()}
+        by_type, overall = {}, {}
+        for (platform_name, checker_type), totals in phases.items():
+            type_totals = by_type.setdefault(checker_type, {})
+            for phase, seconds in totals.items():
+                type_totals[phase] = type_totals.get(phase, 0.0) + seconds
+                overall[phase] = overall.get(phase, 0.0) + seconds
+        return {
+            'wall_time': self.wall_time,
+            'samples': self.samples,
+            'overall': overall,
+            'by_checker_type': by_type,
+            'by_platform': {f"{name} [{checker_type}]": totals
+                            for (name, checker_type), totals in sorted(phases.items())},
+        }
+
+    def write(self, directory):
+        """Write stacks.folded, phases.json and phases.txt; returns the summary."""
+        os.makedirs(directory, exist_ok=True)
+        summary = self.summary()
+
+        with open(os.path.join(directory, 'stacks.folded'), 'w', encoding='utf-8') as f:
+            for stack, count in sorted(self.stacks.items()):
+                f.write(f"{stack} {count}\n")
+        with open(os.path.join(directory, 'phases.json'), 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2)
+        with open(os.path.join(directory, 'phases.txt'), 'w', encoding='utf-8') as f:
+            f.write(format_report(summary))
+        return summary
+
+
+def _row(label, totals, width):
+    cells = ''.join(f"{totals.get(phase, 0.0) * 1000:>{len(phase) + 2}.1f}" for phase in PHASES)
+    return f"{label:<{width}}{totals.get('total', 0.0) * 1000:>10.1f}{cells}\n"
+
+
+def format_report(summary):
+    """Plain-text phase tables (milliseconds, summed over threads)."""
+    labels = list(summary['by_platform']) + list(summary['by_checker_type'])
+    width = max([len(label) for label in labels] + [20]) + 2
+    header = f"{'':<{width}}{'total':>10}" + ''.join(f"{phase:>{len(phase) + 2}}" for phase in PHASES) + '\n'
+
+    lines = [f"Wall time: {summary['wall_time'] * 1000:.1f}ms, {summary['samples']} stack samples\n",
+             "Phase times in ms, summed over worker threads\n\n",
+             "Overall\n", header, _row('all', summary['overall'], width),
+             "\nBy checker type\n", header]
+    for checker_type, totals in sorted(summary['by_checker_type'].items()):
+        lines.append(_row(checker_type, totals, width))
+    lines += ["\nBy platform (slowest first)\n", header]
+    platforms = sorted(summary['by_platform'].items(), key=lambda item: -item[1].get('total', 0.0))
+    for label, totals in platforms:
+        lines.append(_row(label, totals, width))
+    return ''.join(lines)
@@ -0,0 +1,127 @@
+"""
+Progress rendering decoupled from the worker threads.
+"""
+
+import queue
+import shutil
+import sys
+import threading
+import time
+from colorama import Fore, Style
+from colorama.ansi import clear_line
+
+STATUS_STYLES = {
+    'available': (Fore.GREEN, "✅"),
+    'taken': (Fore.RED, "❌"),
+}
+
+
+class ProgressRenderer:
+    """
+    Renders scan progress from a single background thread.
+
+    Workers only call ``post()``, which puts a tuple on a ``SimpleQueue``
+    and returns immediately; counting, formatting and terminal I/O all
+    happen on the renderer thread at a fixed frame rate, so a slow terminal
+    never holds up a request.
+    """
+
+    def __init__(self, total, category_totals=None, verbose=False, fps=10, stream=None):
+        self.total = total
+        self.category_totals = category_totals or {}
+        self.verbose = verbose
+        self.interval = 1.0 / fps
+        self.stream = stream or sys.stdout
+        self.live = self.stream.isatty()
+
+        self.events = queue.SimpleQueue()
+        self.stop_event = threading.Event()
+        self.thread = None
+
+        self.completed = 0
+        self.status_counts = {}
+        self.category_counts = {}
+        self.start_time = None
+        self.line_drawn = False
+
+    def post(self, platform_name, status, category='unknown'):
+        """Record a finished check. Safe to call from any thread."""
+        self.events.put((platform_name, status, category))
+
+    def start(self):
+        self.start_time = time.time()
+        self.thread = threading.Thread(target=self._run, name='progress-renderer', daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """Flush outstanding events and clear the status line."""
+        if self.thread is None:
+            return
+        self.stop_event.set()
+        self.thread.join()
+        self.thread = None
+
+    def _run(self):
+        while not self.stop_event.wait(self.interval):
+            self._render_frame()
+        self._render_frame()
+        if self.line_drawn:
+            self.stream.write('\r' + clear_line())
+            self.stream.flush()
+            self.line_drawn = False
+
+    def _render_frame(self):
+        lines = []
+        while True:
+            try:
+                platform_name, status, category = self.events.get_nowait()
+            except queue.Empty:
+                break
+            self.completed += 1
+            self.status_counts[status] = self.status_counts.get(status, 0) + 1
+            self.category_counts[category] = self.category_counts.get(category, 0) + 1
+            if self.verbose and status != 'error':  # Don't show errors in verbose mode
+                lines.append(self._format_result(platform_name, status))
+
+        if not lines and not self.live:
+            return
+
+        out = []
+        if self.line_drawn:
+            out.append('\r' + clear_line())
+        for line in lines:
+            out.append(line + '\n')
+        if self.live:
+            out.append(self._format_status_line())
+            self.line_drawn = True
+        self.stream.write(''.join(out))
+        self.stream.flush()
+
+    def _format_result(self, platform_name, status):
+        percentage = (self.completed / self.total) * 100 if self.total else 100.0
+        status_color, status_symbol = STATUS_STYLES.get(status, (Fore.YELLOW, "❓"))
+        return (f"[{percentage:5.1f}%] {status_symbol} {platform_name}: "
+                f"{status_color}{Style.BRIGHT}{status.upper()}{Style.RESET_ALL}")
+
+    def _format_status_line(self):
+        elapsed = max(time.time() - self.start_time, 1e-6)
+        rate = self.completed / elapsed
+        remaining = self.total - self.completed
+        eta = f"{remaining / rate:.0f}s" if rate > 0 else "--"
+        percentage = (self.completed / self.total) * 100 if self.total else 100.0
+
+        head = (f"[{percentage:5.1f}%] {self.completed}/{self.total} "
+                f"{rate:.1f}/s ETA {eta} | "
+                f"✅ {self.status_counts.get('available', 0)} "
+                f"❌ {self.status_counts.get('taken', 0)} "
+                f"❓ {self.status_counts.get('unknown', 0) + self.status_counts.get('error', 0)}")
+
+        # Per-category counters, as many as fit on one terminal line
+        width = shutil.get_terminal_size().columns - 4  # emoji are double width
+        line = head
+        for category in sorted(self.category_totals):
+            part = f" | {category} {self.category_counts.get(category, 0)}/{self.category_totals[category]}"
+            if len(line) + len(part) > width:
+                break
+            line += part
+        return f"{Fore.CYAN}{line[:width]}{Style.RESET_ALL}"
@@ -0,0 +1,202 @@
+"""
+Historical results store shared across runs.
+
+SQLite is used by default; a ``postgresql://`` URL switches to PostgreSQL
+through psycopg2. Results are buffered and inserted in batches.
+"""
+
+import os
+import time
+
+DEFAULT_STORE = 'scan_history.db'
+
+SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS results (
+        id {id_type},
+        run_id TEXT NOT NULL,
+        username TEXT NOT NULL,
+        platform TEXT NOT NULL,
+        category TEXT,
+        status TEXT NOT NULL,
+        status_code INTEGER,
+        url TEXT,
+        response_time REAL,
+        error TEXT,
+        checked_at DOUBLE PRECISION NOT NULL
+    )""",
+    "CREATE INDEX IF NOT EXISTS idx_results_username_platform_time "
+    "ON results (username, platform, checked_at)",
+    "CREATE INDEX IF NOT EXISTS idx_results_status ON results (status)",
+    "CREATE INDEX IF NOT EXISTS idx_results_platform_time ON results (platform, checked_at)",
+]
+
+COLUMNS = ('run_id', 'username', 'platform', 'category', 'status', 'status_code',
+           'url', 'response_time', 'error', 'checked_at')
+
+
+def parse_since(value):
+    """
+    Turn ``30m``, ``24h``, ``7d``, ``2w`` or an ISO date into a Unix timestamp.
+    """
+    if value is None:
+        return None
+    units = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400, 'w': 604800}
+    value = value.strip()
+    if value[-1:].lower() in units and value[:-1].replace('.', '', 1).isdigit():
+        return time.time() - float(value[:-1]) * units[value[-1].lower()]
+    from datetime import datetime
+    try:
+        return datetime.fromisoformat(value).timestamp()
+    except ValueError:
+        raise ValueError(f"Invalid time window '{value}' (use e.g. 24h, 7d or 2025-07-01)")
+
+
+class ResultStore:
+    """Append-only store of check results with indexed history queries."""
+
+    def __init__(self, url=DEFAULT_STORE, batch_size=500):
+        self.url = url
+        self.batch_size = batch_size
+        self.run_id = os.urandom(16).hex()
+        self.pending = []
+
+        if url.startswith(('postgres://', 'postgresql://')):
+            try:
+                import psycopg2
+            except ImportError:
+                raise RuntimeError("PostgreSQL storage requires psycopg2 (pip install psycopg2-binary)")
+            self.conn = psycopg2.connect(url)
+            self.placeholder = '%s'
+            id_type = 'BIGSERIAL PRIMARY KEY'
+        else:
+            import sqlite3
+            path = url[len('sqlite:///'):] if url.startswith('sqlite:///') else url
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self.conn = sqlite3.connect(path, check_same_thread=False)
+            self.conn.execute('PRAGMA journal_mode=WAL')
+            self.conn.execute('PRAGMA synchronous=NORMAL')
+            self.placeholder = '?'
+            id_type = 'INTEGER PRIMARY KEY AUTOINCREMENT'
+
+        cursor = self.conn.cursor()
+        for statement in SCHEMA:
+            cursor.execute(statement.format(id_type=id_type))
+        self.conn.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def add(self, result):
+        """Queue a result; writes happen once ``batch_size`` are pending."""
+        self.pending.append((
+            self.run_id,
+            result['username'],
+            result['platform'],
+            result.get('category'),
+            result['status'],
+            result.get('status_code'),
+            result.get('url'),
+            result.get('response_time'),
+            result.get('error'),
+            time.time()
+        ))
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """Insert all pending results in a single transaction."""
+        if not self.pending:
+            return
+        placeholders = ', '.join([self.placeholder] * len(COLUMNS))
+        cursor = self.conn.cursor()
+        cursor.executemany(
+            f"INSERT INTO results ({', '.join(COLUMNS)}) VALUES ({placeholders})",
+            self.pending
+        )
+        self.conn.commit()
+        self.pending = []
+
+    def close(self):
+        if self.conn is None:
+            return
+        self.flush()
+        self.conn.close()
+        self.conn = None
+
+    def _query(self, sql, params):
+        cursor = self.conn.cursor()
+        cursor.execute(sql.replace('?', self.placeholder), params)
+        names = [d[0] for d in cursor.description]
+        return [dict(zip(names, row)) for row in cursor.fetchall()]
+
+    @staticmethod
+    def _where(username=None, platforms=None, status=None, since=None):
+        clauses, params = [], []
+        if username:
+            clauses.append('username = ?')
+            params.append(username)
+        if platforms:
+            clauses.append(f"platform IN ({', '.join('?' * len(platforms))})")
+            params.extend(platforms)
+        if status:
+            clauses.append('status = ?')
+            params.append(status)
+        if since is not None:
+            clauses.append('checked_at >= ?')
+            params.append(since)
+        return (' WHERE ' + ' AND '.join(clauses)) if clauses else '', params
+
+    def history(self, username=None, platforms=None, status=None, since=None, limit=100):
+        """Most recent results matching the filters, newest first."""
+        where, params = self._where(username, platforms, status, since)
+        return self._query(
+            f"SELECT username, platform, category, status, status_code, url, response_time, "
+            f"error, checked_at, run_id FROM results{where} ORDER BY checked_at DESC LIMIT ?",
+            params + [limit]
+        )
+
+    def latest(self, username=None, platforms=None, status=None, limit=100):
+        """Latest known result for each (username, platform) pair."""
+        where, params = self._where(username, platforms)
+        sql = (
+            f"SELECT username, platform, category, status, status_code, url, response_time, "
+            f"error, checked_at, run_id FROM ("
+            f"SELECT r.*, ROW_NUMBER() OVER (PARTITION BY username, platform "
+            f"ORDER BY checked_at DESC) AS rn FROM results r{where}"
+            f") latest WHERE rn = 1"
+        )
+        if status:
+            sql += " AND status = ?"
+            params.append(status)
+        sql += " ORDER BY username, platform LIMIT ?"
+        params.append(limit)
+        return self._query(sql, params)
+
+    def transitions(self, to_status, username=None, platforms=None, since=None, limit=100):
+        """
+        Pairs whose status changed to ``to_status`` (e.g. "which handles
+        became available on GitHub this week"). Only definitive statuses
+        count, so a flaky ``unknown`` in between is not treated as a change.
+        """
+        # Only rows that landed on ``to_status`` inside the window are
+        # scanned; each looks up its predecessor through the
+        # (username, platform, checked_at) index.
+        where, params = self._where(username, platforms, to_status, since)
+        sql = (
+            f"SELECT username, platform, category, previous_status, status, url, checked_at FROM ("
+            f"SELECT username, platform, category, status, url, checked_at, "
+            f"(SELECT p.status FROM results p WHERE p.username = r.username "
+            f"AND p.platform = r.platform AND p.checked_at < r.checked_at "
+            f"AND p.status IN ('available', 'taken') "
+            f"ORDER BY p.checked_at DESC LIMIT 1) AS previous_status "
+            f"FROM results r{where}"
+            f") changes WHERE previous_status IS NOT NULL AND previous_status <> status "
+            f"ORDER BY checked_at DESC LIMIT ?"
+        )
+        params.append(limit)
+        return self._query(sql, params)
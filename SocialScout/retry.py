@@ -0,0 +1,119 @@
+"""
+Retry policy for platform probes.
+
+Transient failures (connection resets, timeouts, 429/5xx answers) are
+retried with full-jitter exponential backoff. Every retry is paid for from a
+shared ``RetryBudget`` that only refills as first attempts are made, so
+during an outage retries stay a small fraction of the normal traffic instead
+of multiplying it.
+"""
+
+import random
+import threading
+import time
+
+import requests
+
+import profiler
+
+DEFAULT_RETRY_STATUSES = (429, 500, 502, 503, 504)
+DEFAULT_RETRY_EXCEPTIONS = (requests.ConnectionError, requests.Timeout)
+# ConnectionError subclasses that fail the same way every time
+DEFAULT_NO_RETRY_EXCEPTIONS = (requests.exceptions.SSLError, requests.exceptions.ProxyError)
+
+
+class RetryBudget:
+    """
+    Token bucket shared by all checkers.
+
+    Each first attempt deposits ``ratio`` tokens and each retry withdraws
+    one, so retries can add at most ``ratio`` extra load on top of
+    ``min_retries`` spare tokens the bucket starts with (and never exceeds).
+    """
+
+    def __init__(self, ratio=0.2, min_retries=10):
+        self.ratio = ratio
+        self.capacity = max(min_retries, 1)
+        self.tokens = float(min_retries)
+        self.spent = 0
+        self.denied = 0
+        self.lock = threading.Lock()
+
+    def deposit(self):
+        with self.lock:
+            self.tokens = min(self.tokens + self.ratio, self.capacity)
+
+    def withdraw(self):
+        """Take one retry token; False if the budget is exhausted."""
+        with self.lock:
+            if self.tokens < 1:
+                self.denied += 1
+                return False
+            self.tokens -= 1
+            self.spent += 1
+            return True
+
+
+class RetryPolicy:
+    """
+    Which failures to retry, how often, and how long to wait in between.
+
+    Args:
+        max_retries: Retries after the first attempt (a platform may override
+            this with ``"max_retries"`` in platforms.json)
+        base_delay: Backoff before the first retry, doubled for each one after
+        max_delay: Upper bound for a single backoff, including Retry-After
+        retry_statuses: HTTP status codes worth another attempt
+        retry_exceptions: requests exception classes worth another attempt
+        no_retry_exceptions: subclasses of those that are never retried
+        budget: RetryBudget shared across checkers, or None for no limit
+    """
+
+    def __init__(self, max_retries=2, base_delay=0.5, max_delay=8.0,
+                 retry_statuses=DEFAULT_RETRY_STATUSES,
+                 retry_exceptions=DEFAULT_RETRY_EXCEPTIONS,
+                 no_retry_exceptions=DEFAULT_NO_RETRY_EXCEPTIONS, budget=None):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retry_statuses = set(retry_statuses)
+        self.retry_exceptions = tuple(retry_exceptions)
+        self.no_retry_exceptions = tuple(no_retry_exceptions)
+        self.budget = budget
+
+    def retries_for(self, platform_config):
+        return platform_config.get('max_retries', self.max_retries)
+
+    def should_retry(self, attempt, max_retries, error=None, response=None):
+        """Whether attempt number ``attempt`` (0-based) may be followed by another."""
+        if attempt >= max_retries:
+            return False
+        if error is not None:
+            retryable = (isinstance(error, self.retry_exceptions)
+                         and not isinstance(error, self.no_retry_exceptions))
+        else:
+            retryable = response.status_code in self.retry_statuses
+        if not retryable:
+            return False
+        return self.budget is None or self.budget.withdraw()
+
+    def backoff(self, attempt, response=None):
+        """Seconds to wait before retry ``attempt + 1``."""
+        if response is not None:
+            retry_after = response.headers.get('Retry-After', '')
+            if retry_after.isdigit():
+                return min(int(retry_after), self.max_delay)
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    def first_attempt(self):
+        if self.budget is not None:
+            self.budget.deposit()
+
+    def sleep(self, attempt, response=None, cancel_event=None):
+        """Back off before the next retry; returns early once cancel_event is set."""
+        delay = self.backoff(attempt, response)
+        with profiler.timed('retry_backoff'):
+            if cancel_event is None:
+                time.sleep(delay)
+            else:
+                cancel_event.wait(delay)
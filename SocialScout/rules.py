@@ -0,0 +1,424 @@
+"""
+Declarative detection rules, compiled once per platform.
+
+Every checker type has a default rule list (see ``checkers.py``) and any
+platform in ``platforms.json`` can put its own ``rules`` in front of it
+(or replace it with ``"inherit_rules": false``). Rules are evaluated in
+order and the first one whose predicates all match decides the status;
+``"default"`` (``unknown`` if omitted) applies when none match.
+
+    "rules": [
+      {"status_code": 404, "result": "available"},
+      {"redirect": ["/login", "/signup"], "result": "available"},
+      {"status_code": 200, "body": ["account suspended"], "result": "taken"},
+      {"status_code": 200, "title": ["not found"], "result": "available"},
+      {"status_code": 200, "json": {"path": "data.user", "truthy": true}, "result": "taken"},
+      {"header": {"name": "content-type", "contains": "json"}, "result": "unknown"}
+    ]
+
+Predicates:
+    status_code  int, "4xx"-style class, or a list of those
+    header       {"name": ..., "contains"|"equals": str} or {"name": ..., "exists": bool}
+    redirect     true (any redirect) or substrings of the redirect target
+    body         substrings of the response body (any may match)
+    title        true (page has a <title>) or substrings of the title text
+    json         {"path": "a.b.0", "exists"|"truthy": bool} or {"path": ..., "equals": value};
+                 an empty object just requires a JSON body
+
+Status, header and redirect predicates are answered from the response
+headers. The compiled plan reads the body only when a rule that still
+applies needs it and the remaining candidates disagree. It then streams
+the body and stops as soon as the first applicable rule is settled, so
+for example a title rule stops reading at ``</title>``.
+
+Bodies are decompressed as they are streamed and never read past the
+platform's ``max_body_bytes`` (decoded, default 512 KiB); rules are then
+settled on that prefix. Body and title markers not found in it count as
+absent, and a truncated body never satisfies a json predicate.
+
+Body and title markers are compared case-insensitively on the decoded
+text (charset from Content-Type, UTF-8 otherwise), so non-ASCII markers
+such as "Страница не найдена" match regardless of case.
+
+``follow`` is not a platform result: only RedirectChecker's built-in rules
+use it, to ask for the next redirect hop.
+"""
+
+import codecs
+import html
+import json
+import re
+import time
+from collections import namedtuple
+from urllib.parse import urljoin
+
+import profiler
+
+RESULTS = ('available', 'taken', 'unknown')
+# Extra result for checker default rules that walk redirect chains
+FOLLOW = 'follow'
+RULE_KEYS = {'result', 'status_code', 'header', 'redirect', 'body', 'title', 'json', 'comment'}
+BODY_KEYS = ('body', 'title', 'json')
+CHUNK_SIZE = 16384
+DEFAULT_MAX_BODY_BYTES = 512 * 1024
+
+TITLE_RE = re.compile(rb'<title[^>]*>(.*?)</title\s*>', re.IGNORECASE | re.DOTALL)
+TITLE_OPEN_RE = re.compile(rb'<title[\s>]', re.IGNORECASE)
+# A <title> only belongs in the head; once this is seen there is none
+HEAD_END_RE = re.compile(rb'</head\s*>|<body[\s>]', re.IGNORECASE)
+# Bytes rescanned from the previous chunk so tags split across chunks are found
+TAG_OVERLAP = 16
+CHARSET_RE = re.compile(r'charset=["\']?([\w.:-]+)', re.IGNORECASE)
+
+# Outcome of evaluating a plan against a response; body_capped means reading
+# stopped at max_body_bytes rather than because the rules were settled
+Verdict = namedtuple('Verdict', ['status', 'body_bytes', 'body_complete', 'body_capped'])
+
+_MISSING = object()
+
+
+def _as_list(value):
+    return value if isinstance(value, list) else [value]
+
+
+def body_encoding(response):
+    """Charset declared in Content-Type if Python knows it, else UTF-8."""
+    match = CHARSET_RE.search(response.headers.get('Content-Type', ''))
+    if match:
+        try:
+            return codecs.lookup(match.group(1)).name
+        except LookupError:
+            pass
+    return 'utf-8'
+
+
+def _json_lookup(data, path):
+    """Walk a dotted path (list indexes as integers) through parsed JSON."""
+    if not path:
+        return data
+    for part in path.split('.'):
+        if isinstance(data, dict) and part in data:
+            data = data[part]
+        elif isinstance(data, list) and part.lstrip('-').isdigit() and -len(data) <= int(part) < len(data):
+            data = data[int(part)]
+        else:
+            return _MISSING
+    return data
+
+
+class BodyState:
+    """
+    Incrementally read body prefix shared by all rules of one evaluation.
+
+    ``lowered`` is the body decoded with ``encoding``, lower-cased with
+    str.lower() and re-encoded as UTF-8, the same way markers are compiled.
+    """
+
+    def __init__(self, encoding='utf-8'):
+        self.encoding = encoding
+        self._decoder = codecs.getincrementaldecoder(encoding)(errors='replace')
+        self.raw = bytearray()
+        self.lowered = bytearray()
+        self.complete = False
+        # Set instead of complete when the rest of the body is not read
+        self.truncated = False
+        # marker -> offset scanned up to, or -1 once found
+        self._scanned = {}
+        self._title = _MISSING
+        self._title_start = None
+        self._title_scanned = 0
+        self._json = _MISSING
+
+    @property
+    def size(self):
+        return len(self.raw)
+
+    def feed(self, chunk):
+        self.raw += chunk
+        self.lowered += self._decoder.decode(chunk).lower().encode('utf-8')
+
+    @property
+    def settled(self):
+        """No more body will be fed."""
+        return self.complete or self.truncated
+
+    def finish(self, truncated=False):
+        """Stop feeding; truncated means the body went on past what was fed."""
+        self.lowered += self._decoder.decode(b'', final=True).lower().encode('utf-8')
+        self.complete = not truncated
+        self.truncated = truncated
+
+    def contains(self, marker):
+        """Whether marker occurs in the body so far; repeated calls only scan new bytes."""
+        scanned = self._scanned.get(marker, 0)
+        if scanned < 0:
+            return True
+        if self.lowered.find(marker, max(scanned - len(marker) + 1, 0)) != -1:
+            self._scanned[marker] = -1
+            return True
+        self._scanned[marker] = len(self.lowered)
+        return False
+
+    def title(self):
+        """Lower-cased title text, None if there is none, _MISSING if not known yet."""
+        if self._title is not _MISSING:
+            return self._title
+        if self._title_start is None:
+            # Only bytes fed since the last call are searched for the tag
+            offset = max(self._title_scanned - TAG_OVERLAP, 0)
+            self._title_scanned = len(self.raw)
+            opening = TITLE_OPEN_RE.search(self.raw, offset)
+            head_end = HEAD_END_RE.search(self.raw, offset)
+            if head_end and (not opening or head_end.start() < opening.start()):
+                self._title = None
+                return None
+            if not opening:
+                if self.settled:
+                    self._title = None
+                return self._title
+            self._title_start = opening.start()
+        match = TITLE_RE.match(self.raw, self._title_start)
+        if match:
+            text = match.group(1).decode(self.encoding, errors='replace')
+            self._title = html.unescape(text).strip().lower()
+        elif self.settled:
+            self._title = None
+        return self._title
+
+    def json(self):
+        """Parsed JSON body, None if it isn't (or was truncated), _MISSING if not complete yet."""
+        if self._json is _MISSING and self.complete:
+            try:
+                self._json = json.loads(bytes(self.raw))
+            except ValueError:
+                self._json = None
+        elif self._json is _MISSING and self.truncated:
+            self._json = None
+        return self._json
+
+
+class Rule:
+    """One compiled rule: header-phase and body-phase predicates plus a result."""
+
+    def __init__(self, spec, platform_name, results=RESULTS):
+        if not isinstance(spec, dict):
+            raise ValueError(f"{platform_name}: each rule must be an object, got {spec!r}")
+        unknown_keys = set(spec) - RULE_KEYS
+        if unknown_keys:
+            raise ValueError(f"{platform_name}: unknown rule keys {sorted(unknown_keys)}")
+        if spec.get('result') not in results:
+            raise ValueError(f"{platform_name}: rule result must be one of {results}, got {spec.get('result')!r}")
+
+        self.result = spec['result']
+        self.status_codes = None
+        self.status_classes = None
+        self.headers = []
+        self.redirect = None
+        self.body = None
+        self.title = None
+        self.json = None
+
+        if 'status_code' in spec:
+            codes, classes = set(), set()
+            for code in _as_list(spec['status_code']):
+                if isinstance(code, str) and re.fullmatch(r'[1-5]xx', code.lower()):
+                    classes.add(int(code[0]))
+                else:
+                    codes.add(int(code))
+            self.status_codes, self.status_classes = codes, classes
+
+        for header in _as_list(spec.get('header', [])):
+            if not isinstance(header, dict) or 'name' not in header:
+                raise ValueError(f"{platform_name}: header predicate needs a name, got {header!r}")
+            self.headers.append((
+                header['name'],
+                header.get('contains', '').lower() if 'contains' in header else None,
+                header.get('equals'),
+                header.get('exists')
+            ))
+
+        if 'redirect' in spec:
+            redirect = spec['redirect']
+            self.redirect = True if redirect is True else [m.lower() for m in _as_list(redirect)]
+
+        if 'body' in spec:
+            self.body = [m.lower().encode('utf-8') for m in _as_list(spec['body'])]
+
+        if 'title' in spec:
+            title = spec['title']
+            self.title = True if title is True else [m.lower() for m in _as_list(title)]
+
+        if 'json' in spec:
+            predicate = spec['json']
+            if not isinstance(predicate, dict):
+                raise ValueError(f"{platform_name}: json predicate must be an object, got {predicate!r}")
+            self.json = predicate
+
+        self.header_only = self.body is None and self.title is None and self.json is None
+
+    def match_headers(self, response, redirect_target):
+        if self.status_codes is not None:
+            code = response.status_code
+            if code not in self.status_codes and code // 100 not in self.status_classes:
+                return False
+
+        for name, contains, equals, exists in self.headers:
+            value = response.headers.get(name)
+            if exists is not None and (value is not None) != exists:
+                return False
+            if contains is not None and (value is None or contains not in value.lower()):
+                return False
+            if equals is not None and value != equals:
+                return False
+
+        if self.redirect is not None:
+            if redirect_target is None:
+                return False
+            if self.redirect is not True:
+                target = redirect_target.lower()
+                if not any(marker in target for marker in self.redirect):
+                    return False
+        return True
+
+    def match_body(self, state):
+        """True/False once settled, None while more body could change the answer."""
+        pending = False
+
+        if self.body is not None:
+            if not any(state.contains(marker) for marker in self.body):
+                if state.settled:
+                    return False
+                pending = True
+
+        if self.title is not None:
+            title = state.title()
+            if title is _MISSING:
+                pending = True
+            elif title is None:
+                return False
+            elif self.title is not True and not any(marker in title for marker in self.title):
+                return False
+
+        if self.json is not None:
+            data = state.json()
+            if data is _MISSING:
+                pending = True
+            elif data is None:
+                return False
+            else:
+                value = _json_lookup(data, self.json.get('path', ''))
+                if 'exists' in self.json and (value is not _MISSING) != self.json['exists']:
+                    return False
+                if 'truthy' in self.json and (value is not _MISSING and bool(value)) != self.json['truthy']:
+                    return False
+                if 'equals' in self.json and (value is _MISSING or value != self.json['equals']):
+                    return False
+                if not ({'exists', 'truthy', 'equals'} & set(self.json)) and value is _MISSING:
+                    return False
+
+        return None if pending else True
+
+
+class DetectionPlan:
+    """
+    Rules for one platform, compiled into a two-phase evaluation.
+
+    The header phase walks the rules in order and keeps only those whose
+    status/header/redirect predicates hold. If a header-only rule decides
+    before any body rule applies, or every rule that could still apply
+    leads to the same result, the body is never read.
+    """
+
+    def __init__(self, rules, default='unknown', follow_redirects=True,
+                 max_body_bytes=DEFAULT_MAX_BODY_BYTES):
+        if default not in RESULTS:
+            raise ValueError(f"Rule default must be one of {RESULTS}, got {default!r}")
+        if max_body_bytes <= 0:
+            raise ValueError(f"max_body_bytes must be positive, got {max_body_bytes!r}")
+        self.rules = rules
+        self.default = default
+        self.follow_redirects = follow_redirects
+        self.max_body_bytes = max_body_bytes
+        self.needs_body = any(not rule.header_only for rule in rules)
+
+    @staticmethod
+    def redirect_target(response):
+        """Where the response sends us: its Location, or the final URL if redirects were followed."""
+        if response.is_redirect:
+            return urljoin(response.url, response.headers.get('Location', ''))
+        if response.history:
+            return response.url
+        return None
+
+    def evaluate(self, response):
+        """Classify a (streamed) response, reading as little of the body as possible."""
+        target = self.redirect_target(response)
+
+        candidates = []
+        fallback = self.default
+        for rule in self.rules:
+            if not rule.match_headers(response, target):
+                continue
+            if rule.header_only:
+                fallback = rule.result
+                break
+            candidates.append(rule)
+
+        if not candidates or len({rule.result for rule in candidates} | {fallback}) == 1:
+            return Verdict(fallback, 0, False, False)
+
+        start = time.perf_counter()
+        state = BodyState(body_encoding(response))
+        verdict, rules_time = self._read_body(response, candidates, state, fallback)
+        profiler.record('rules', rules_time)
+        profiler.record('body', time.perf_counter() - start - rules_time)
+        return verdict
+
+    def _read_body(self, response, candidates, state, fallback):
+        """Stream the body until the candidates are settled; returns (verdict, seconds spent matching)."""
+        rules_time = 0.0
+        capped = False
+        for chunk in response.iter_content(min(CHUNK_SIZE, self.max_body_bytes)):
+            remaining = self.max_body_bytes - state.size
+            if len(chunk) > remaining:
+                # Settle on the prefix; the rest of the body is never read
+                state.feed(chunk[:remaining])
+                capped = True
+                break
+            state.feed(chunk)
+            start = time.perf_counter()
+            decided = self._decide(candidates, state, fallback)
+            rules_time += time.perf_counter() - start
+            if decided is not None:
+                return Verdict(decided, state.size, False, False), rules_time
+        # A recorded body prefix (cassette.RecordedBody) ends early but is still partial
+        capped = capped or getattr(response.raw, 'truncated', False)
+        state.finish(truncated=capped)
+        start = time.perf_counter()
+        decided = self._decide(candidates, state, fallback)
+        return Verdict(decided, state.size, not capped, capped), rules_time + time.perf_counter() - start
+
+    @staticmethod
+    def _decide(candidates, state, fallback):
+        for rule in candidates:
+            matched = rule.match_body(state)
+            if matched is None:
+                return None
+            if matched:
+                return rule.result
+        return fallback
+
+
+def compile_plan(platform_name, platform_config, default_rules, follow_redirects=True,
+                 default_results=RESULTS):
+    """
+    Build the DetectionPlan for a platform from its own and its checker's rules.
+
+    Platform rules may only produce RESULTS; ``default_results`` is what the
+    checker's own rules may produce (RedirectChecker adds FOLLOW).
+    """
+    rules = [Rule(spec, platform_name) for spec in platform_config.get('rules', [])]
+    if platform_config.get('inherit_rules', True):
+        rules.extend(Rule(spec, platform_name, default_results) for spec in default_rules)
+    return DetectionPlan(rules, platform_config.get('default', 'unknown'), follow_redirects,
+                         platform_config.get('max_body_bytes', DEFAULT_MAX_BODY_BYTES))
@@ -0,0 +1,79 @@
+"""Recording and replaying bodies longer than the cassette keeps."""
+
+import http.server
+import threading
+
+import pytest
+import requests
+
+from cassette import Cassette, CassetteTransport
+from rules import compile_plan
+
+BODY = b'{"user": null}' + b' ' * 200
+
+
+class Handler(http.server.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(BODY)))
+        self.end_headers()
+        self.wfile.write(BODY)
+
+
+@pytest.fixture(scope='module')
+def url():
+    httpd = http.server.ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    httpd.daemon_threads = True
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}/josh"
+    httpd.shutdown()
+
+
+def session_for(transport=None):
+    session = requests.Session()
+    session.trust_env = False
+    if transport:
+        transport.mount(session)
+    return session
+
+
+def evaluate(session, url, max_body_bytes):
+    plan = compile_plan('Example', {
+        'max_body_bytes': max_body_bytes,
+        'rules': [{'json': {'path': 'user', 'equals': None}, 'result': 'available'}],
+        'default': 'taken',
+    }, [])
+    with session.get(url, stream=True) as response:
+        return plan.evaluate(response)
+
+
+@pytest.mark.parametrize('max_body_bytes', [32, 64])
+def test_truncated_recording_classifies_like_the_network(tmp_path, url, max_body_bytes):
+    live = evaluate(session_for(), url, max_body_bytes)
+    assert (live.status, live.body_capped) == ('taken', True)
+
+    cassette = Cassette(str(tmp_path), max_body_bytes=64)
+    cassette.start_recording()
+    recorded = evaluate(session_for(CassetteTransport(cassette, 'record')), url, max_body_bytes)
+    cassette.close()
+    assert recorded == live
+
+    replay = CassetteTransport(Cassette(str(tmp_path)).load(), 'replay')
+    assert evaluate(session_for(replay), url, max_body_bytes) == live
+
+
+def test_untruncated_recording_is_complete(tmp_path, url):
+    cassette = Cassette(str(tmp_path))
+    cassette.start_recording()
+    recorded = evaluate(session_for(CassetteTransport(cassette, 'record')), url, 1024)
+    cassette.close()
+    assert recorded == ('available', len(BODY), True, False)
+
+    replay = CassetteTransport(Cassette(str(tmp_path)).load(), 'replay')
+    assert evaluate(session_for(replay), url, 1024) == recorded
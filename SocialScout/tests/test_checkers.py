@@ -0,0 +1,73 @@
+"""RedirectChecker hops against a local HTTP server."""
+
+import http.server
+import threading
+
+import pytest
+
+from checkers import DRAIN_LIMIT, RedirectChecker
+
+
+class Handler(http.server.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    connections = []
+
+    def log_message(self, *args):
+        pass
+
+    def setup(self):
+        self.connections.append(self.client_address)
+        super().setup()
+
+    def do_GET(self):
+        if self.path.startswith('/small/'):
+            self.redirect('/profile/josh', b'moved' * 20)
+        elif self.path.startswith('/large/'):
+            self.redirect('/profile/josh', b'x' * (DRAIN_LIMIT * 16))
+        else:
+            self.send_response(200)
+            self.send_header('Content-Length', '2')
+            self.end_headers()
+            self.wfile.write(b'ok')
+
+    def redirect(self, location, body):
+        self.send_response(302)
+        self.send_header('Location', location)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        try:
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+
+@pytest.fixture
+def server():
+    Handler.connections.clear()
+    httpd = http.server.ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    httpd.daemon_threads = True
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+
+
+def check(server, path):
+    checker = RedirectChecker()
+    checker.session.trust_env = False
+    config = {'url_pattern': f"{server}/{path}/{{username}}", 'category': 'test'}
+    return checker, checker.check('Example', config, 'josh')
+
+
+def test_small_redirect_body_is_drained_and_connection_reused(server):
+    checker, result = check(server, 'small')
+    assert (result['status'], result['redirect_hops']) == ('taken', 1)
+    assert len(Handler.connections) == 1
+    assert checker.transfer.wire_bytes == 100 + 2
+
+
+def test_large_redirect_body_is_not_read(server):
+    checker, result = check(server, 'large')
+    assert (result['status'], result['redirect_hops']) == ('taken', 1)
+    assert len(Handler.connections) == 2
+    assert checker.transfer.wire_bytes < DRAIN_LIMIT
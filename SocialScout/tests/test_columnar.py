@@ -0,0 +1,80 @@
+"""Round trips through columnar archives."""
+
+import pytest
+
+from columnar import ColumnarReader, ColumnarWriter
+
+
+def _result(i, status='taken', category='social', **extra):
+    result = {
+        'username': f"user{i % 3}",
+        'platform': f"Platform{i}",
+        'category': category,
+        'status': status,
+        'status_code': 200,
+        'url': f"https://example.com/user{i}",
+        'response_time': 12.5 + i,
+    }
+    result.update(extra)
+    return result
+
+
+@pytest.fixture
+def archive(tmp_path):
+    return str(tmp_path / 'scan.col')
+
+
+def test_round_trip_across_chunks(archive):
+    results = [_result(i, status='available' if i % 4 == 0 else 'taken') for i in range(10)]
+    with ColumnarWriter(archive, chunk_rows=3) as writer:
+        writer.write_many(results)
+
+    assert list(ColumnarReader(archive).iter_results()) == results
+
+
+def test_filters_are_case_insensitive_and_combined(archive):
+    results = [
+        _result(0, status='available', category='developer'),
+        _result(1, status='taken', category='developer'),
+        _result(2, status='available', category='gaming'),
+        _result(3, status='error', category='gaming', error='boom'),
+    ]
+    with ColumnarWriter(archive, chunk_rows=2) as writer:
+        writer.write_many(results)
+
+    reader = ColumnarReader(archive)
+    assert [r['platform'] for r in reader.iter_results(status='AVAILABLE')] == ['Platform0', 'Platform2']
+    assert [r['platform'] for r in reader.iter_results(status='available', category='gaming')] == ['Platform2']
+    assert [r['platform'] for r in reader.iter_results(platform=['platform1', 'Platform3'])] == ['Platform1', 'Platform3']
+    assert list(reader.iter_results(status='unknown')) == []
+    assert next(reader.iter_results(status='error'))['error'] == 'boom'
+
+
+def test_missing_values_stay_missing(archive):
+    result = {'username': 'josh', 'platform': 'GitHub', 'category': 'developer',
+              'status': 'error', 'url': None, 'error': None}
+    with ColumnarWriter(archive) as writer:
+        writer.write(result)
+        writer.write(_result(1, response_time=0))
+
+    missing, zero = ColumnarReader(archive).iter_results()
+    assert 'response_time' not in missing
+    assert 'status_code' not in missing
+    assert 'error' not in missing
+    assert missing['url'] == ''
+    assert zero['response_time'] == 0.0
+
+
+def test_extra_keys_round_trip(archive):
+    result = _result(0, retries=2, redirect='https://example.com/login')
+    with ColumnarWriter(archive) as writer:
+        writer.write(result)
+
+    assert list(ColumnarReader(archive).iter_results()) == [result]
+
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / 'not.col'
+    path.write_bytes(b'hello')
+    with pytest.raises(ValueError):
+        list(ColumnarReader(str(path)).iter_results())
@@ -0,0 +1,58 @@
+"""Connection pre-warming against a local HTTP server."""
+
+import http.server
+import threading
+
+import pytest
+import requests
+
+from dns_cache import prewarm
+
+
+class Handler(http.server.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    connections = []
+    paths = []
+
+    def log_message(self, *args):
+        pass
+
+    def setup(self):
+        self.connections.append(self.client_address)
+        super().setup()
+
+    def do_GET(self):
+        self.paths.append(self.path)
+        self.send_response(200)
+        self.send_header('Content-Length', '2')
+        self.end_headers()
+        self.wfile.write(b'ok')
+
+
+@pytest.fixture
+def server():
+    Handler.connections.clear()
+    Handler.paths.clear()
+    httpd = http.server.ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    httpd.daemon_threads = True
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://localhost:{httpd.server_address[1]}"
+    httpd.shutdown()
+
+
+def test_prewarm_connects_without_sending_a_request(server):
+    session = requests.Session()
+    session.trust_env = False
+    report = prewarm([(session, f"{server}/josh"), (session, f"{server}/ann")])
+
+    assert (report['hosts'], report['connected'], report['failed']) == (1, 1, 0)
+    assert report['warm_ms'] == pytest.approx(report['dns_ms'] + report['connect_ms'], abs=0.2)
+    assert Handler.paths == []
+    assert len(Handler.connections) == 1
+
+    # The first probes reuse the warmed connection
+    session.get(f"{server}/josh")
+    session.get(f"{server}/ann")
+    assert Handler.paths == ['/josh', '/ann']
+    assert len(Handler.connections) == 1
@@ -0,0 +1,70 @@
+"""History queries on a temporary SQLite results store."""
+
+import itertools
+
+import pytest
+
+import results_store
+from results_store import ResultStore
+
+
+class FakeClock:
+    """Stands in for the time module so every result gets a distinct checked_at."""
+
+    def __init__(self):
+        self.ticks = itertools.count(1000)
+
+    def time(self):
+        return float(next(self.ticks))
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.setattr(results_store, 'time', FakeClock())
+    with ResultStore(str(tmp_path / 'history.db')) as store:
+        yield store
+
+
+def add(store, username, platform, status):
+    store.add({'username': username, 'platform': platform, 'category': 'developer',
+               'status': status, 'url': f"https://example.com/{username}"})
+
+
+def test_transitions_and_latest(store):
+    for status in ('taken', 'unknown', 'available', 'available', 'taken'):
+        add(store, 'josh', 'GitHub', status)
+    add(store, 'ann', 'GitHub', 'available')
+    add(store, 'josh', 'Steam', 'taken')
+    add(store, 'josh', 'Steam', 'error')
+    store.flush()
+
+    # taken -> unknown -> available: the unknown in between is skipped, and
+    # the second 'available' is not a change
+    became_available = store.transitions('available')
+    assert [(r['username'], r['platform'], r['previous_status'], r['checked_at'])
+            for r in became_available] == [('josh', 'GitHub', 'taken', 1002.0)]
+
+    # The first 'taken' has no predecessor and is not a transition
+    became_taken = store.transitions('taken')
+    assert [(r['username'], r['platform'], r['previous_status'], r['checked_at'])
+            for r in became_taken] == [('josh', 'GitHub', 'available', 1004.0)]
+
+    latest = store.latest()
+    assert [(r['username'], r['platform'], r['status'], r['checked_at']) for r in latest] == [
+        ('ann', 'GitHub', 'available', 1005.0),
+        ('josh', 'GitHub', 'taken', 1004.0),
+        ('josh', 'Steam', 'error', 1007.0),
+    ]
+    assert [r['platform'] for r in store.latest(username='josh', status='taken')] == ['GitHub']
+
+
+def test_transition_filters(store):
+    for status in ('taken', 'available'):
+        add(store, 'josh', 'GitHub', status)
+        add(store, 'josh', 'Steam', status)
+    store.flush()
+
+    assert [r['platform'] for r in store.transitions('available', platforms=['Steam'])] == ['Steam']
+    assert store.transitions('available', username='ann') == []
+    assert store.transitions('available', since=1003.5) == []
+    assert len(store.transitions('available', since=1002)) == 2
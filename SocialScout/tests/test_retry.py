@@ -0,0 +1,93 @@
+"""RetryBudget token accounting and RetryPolicy decisions."""
+
+import requests
+
+from retry import RetryBudget, RetryPolicy
+
+
+def make_response(status_code, headers=None):
+    response = requests.Response()
+    response.status_code = status_code
+    response.headers.update(headers or {})
+    return response
+
+
+class TestRetryBudget:
+    def test_starts_with_min_retries(self):
+        budget = RetryBudget(ratio=0.5, min_retries=2)
+        assert budget.withdraw()
+        assert budget.withdraw()
+        assert not budget.withdraw()
+        assert (budget.spent, budget.denied) == (2, 1)
+
+    def test_deposits_refill_by_ratio(self):
+        budget = RetryBudget(ratio=0.25, min_retries=0)
+        for _ in range(3):
+            budget.deposit()
+        assert not budget.withdraw()
+        budget.deposit()
+        assert budget.withdraw()
+        assert budget.tokens == 0
+
+    def test_never_exceeds_capacity(self):
+        budget = RetryBudget(ratio=1, min_retries=3)
+        for _ in range(100):
+            budget.deposit()
+        assert budget.tokens == 3
+        assert [budget.withdraw() for _ in range(4)] == [True, True, True, False]
+
+    def test_capacity_is_at_least_one(self):
+        budget = RetryBudget(ratio=1, min_retries=0)
+        budget.deposit()
+        budget.deposit()
+        assert budget.tokens == 1
+
+
+class TestRetryPolicy:
+    def test_retries_transient_errors_only(self):
+        policy = RetryPolicy(max_retries=2)
+        assert policy.should_retry(0, 2, error=requests.ConnectionError())
+        assert policy.should_retry(1, 2, error=requests.Timeout())
+        assert not policy.should_retry(2, 2, error=requests.ConnectionError())
+        assert not policy.should_retry(0, 2, error=requests.TooManyRedirects())
+
+    def test_tls_and_proxy_failures_are_not_retried(self):
+        budget = RetryBudget(min_retries=1)
+        policy = RetryPolicy(budget=budget)
+        assert not policy.should_retry(0, 2, error=requests.exceptions.SSLError())
+        assert not policy.should_retry(0, 2, error=requests.exceptions.ProxyError())
+        assert budget.spent == 0
+        assert policy.should_retry(0, 2, error=requests.exceptions.ConnectTimeout())
+        assert RetryPolicy(no_retry_exceptions=()).should_retry(0, 2, error=requests.exceptions.SSLError())
+
+    def test_retries_statuses(self):
+        policy = RetryPolicy()
+        assert policy.should_retry(0, 2, response=make_response(503))
+        assert not policy.should_retry(0, 2, response=make_response(404))
+
+    def test_retries_draw_from_budget(self):
+        budget = RetryBudget(ratio=0.5, min_retries=1)
+        policy = RetryPolicy(budget=budget)
+        assert policy.should_retry(0, 2, response=make_response(503))
+        assert not policy.should_retry(0, 2, response=make_response(503))
+        policy.first_attempt()
+        policy.first_attempt()
+        assert policy.should_retry(0, 2, response=make_response(503))
+        assert (budget.spent, budget.denied) == (2, 1)
+
+    def test_non_retryable_failures_do_not_spend_tokens(self):
+        budget = RetryBudget(min_retries=1)
+        policy = RetryPolicy(budget=budget)
+        assert not policy.should_retry(0, 2, response=make_response(404))
+        assert not policy.should_retry(2, 2, response=make_response(503))
+        assert budget.spent == 0 and budget.denied == 0
+
+    def test_backoff_honours_retry_after_up_to_cap(self):
+        policy = RetryPolicy(max_delay=5)
+        assert policy.backoff(0, make_response(429, {'Retry-After': '3'})) == 3
+        assert policy.backoff(0, make_response(429, {'Retry-After': '60'})) == 5
+
+    def test_backoff_is_jittered_below_exponential_cap(self):
+        policy = RetryPolicy(base_delay=0.5, max_delay=8)
+        for attempt in range(6):
+            assert 0 <= policy.backoff(attempt) <= min(8, 0.5 * 2 ** attempt)
@@ -0,0 +1,177 @@
+"""Rule compilation and body/title/json matching."""
+
+import io
+
+import pytest
+import requests
+
+from rules import FOLLOW, RESULTS, BodyState, Rule, compile_plan
+
+
+def make_response(status_code=200, body=b'', headers=None, url='https://example.com/user'):
+    response = requests.Response()
+    response.status_code = status_code
+    response.headers.update(headers or {})
+    response.url = url
+    response.raw = io.BytesIO(body)
+    return response
+
+
+def plan_for(rules, default_rules=(), **config):
+    config['rules'] = rules
+    return compile_plan('Example', config, list(default_rules))
+
+
+class TestCompile:
+    def test_rejects_unknown_keys(self):
+        with pytest.raises(ValueError, match='unknown rule keys'):
+            Rule({'result': 'taken', 'bodyy': ['x']}, 'Example')
+
+    def test_rejects_unknown_result(self):
+        with pytest.raises(ValueError, match='rule result'):
+            Rule({'status_code': 200, 'result': 'maybe'}, 'Example')
+
+    def test_rejects_non_object_json_predicate(self):
+        with pytest.raises(ValueError, match='json predicate'):
+            Rule({'json': 'data.user', 'result': 'taken'}, 'Example')
+
+    def test_header_predicate_needs_name(self):
+        with pytest.raises(ValueError, match='needs a name'):
+            Rule({'header': {'contains': 'json'}, 'result': 'unknown'}, 'Example')
+
+    def test_follow_is_rejected_in_platform_rules(self):
+        with pytest.raises(ValueError, match='rule result'):
+            plan_for([{'redirect': True, 'result': FOLLOW}])
+
+    def test_follow_is_rejected_in_defaults_unless_allowed(self):
+        defaults = [{'redirect': True, 'result': FOLLOW}]
+        with pytest.raises(ValueError, match='rule result'):
+            plan_for([], defaults)
+        plan = compile_plan('Example', {}, defaults, default_results=RESULTS + (FOLLOW,))
+        assert plan.rules[0].result == FOLLOW
+
+    def test_follow_is_not_a_platform_default(self):
+        with pytest.raises(ValueError, match='default'):
+            plan_for([], default=FOLLOW)
+
+    def test_status_code_classes(self):
+        plan = plan_for([{'status_code': ['4xx', 500], 'result': 'available'}], default='taken')
+        assert plan.evaluate(make_response(410)).status == 'available'
+        assert plan.evaluate(make_response(500)).status == 'available'
+        assert plan.evaluate(make_response(502)).status == 'taken'
+
+    def test_platform_rules_run_before_defaults(self):
+        plan = plan_for([{'status_code': 200, 'body': ['suspended'], 'result': 'available'}],
+                        [{'status_code': 200, 'result': 'taken'}])
+        assert plan.evaluate(make_response(body=b'Account SUSPENDED')).status == 'available'
+        assert plan.evaluate(make_response(body=b'Welcome')).status == 'taken'
+
+    def test_inherit_rules_false_drops_defaults(self):
+        plan = plan_for([], [{'status_code': 200, 'result': 'taken'}], inherit_rules=False)
+        assert plan.evaluate(make_response()).status == 'unknown'
+
+
+class TestBody:
+    def test_header_only_plan_reads_no_body(self):
+        plan = plan_for([{'status_code': 404, 'result': 'available'}], default='taken')
+        verdict = plan.evaluate(make_response(body=b'x' * 100))
+        assert verdict.status == 'taken'
+        assert verdict.body_bytes == 0
+
+    def test_marker_split_across_chunks(self):
+        state = BodyState()
+        state.feed(b'...page not fo')
+        assert not state.contains(b'not found')
+        state.feed(b'und...')
+        assert state.contains(b'not found')
+
+    def test_non_ascii_marker_matches_other_case(self):
+        plan = plan_for([{'body': ['Страница не найдена'], 'result': 'available'}], default='taken')
+        body = 'СТРАНИЦА НЕ НАЙДЕНА'.encode('utf-8')
+        assert plan.evaluate(make_response(body=body)).status == 'available'
+
+    def test_non_ascii_marker_split_inside_a_character(self):
+        state = BodyState()
+        encoded = 'ÜBER'.encode('utf-8')
+        state.feed(encoded[:1])
+        state.feed(encoded[1:])
+        state.finish()
+        assert state.contains('über'.encode('utf-8'))
+
+    def test_declared_charset_is_used(self):
+        plan = plan_for([{'body': ['страница'], 'result': 'available'}], default='taken')
+        response = make_response(body='СТРАНИЦА'.encode('cp1251'),
+                                 headers={'Content-Type': 'text/html; charset=windows-1251'})
+        assert plan.evaluate(response).status == 'available'
+
+    def test_title(self):
+        plan = plan_for([{'title': ['not found'], 'result': 'available'},
+                         {'title': True, 'result': 'taken'}])
+        page = b'<html><head><title>\n Page Not Found &amp; gone</title></head>'
+        assert plan.evaluate(make_response(body=page)).status == 'available'
+        assert plan.evaluate(make_response(body=b'<title>josh</title>')).status == 'taken'
+        assert plan.evaluate(make_response(body=b'<p>no title</p>')).status == 'unknown'
+
+    def test_title_split_across_chunks(self):
+        state = BodyState()
+        for chunk in (b'<html><head><ti', b'tle lang="en">Jo', b'sh</title', b'></head>'):
+            assert state.title() is not None
+            state.feed(chunk)
+        assert state.title() == 'josh'
+
+    def test_no_title_is_settled_at_end_of_head(self):
+        state = BodyState()
+        state.feed(b'<html><head><meta charset="utf-8"></he')
+        assert state.title() is not None
+        state.feed(b'ad><body><title>not the title</title>')
+        assert state.title() is None
+
+    def test_no_title_stops_reading_at_body(self):
+        plan = plan_for([{'title': ['not found'], 'result': 'available'}], default='taken')
+        page = b'<html><head></head>' + b'<body>' + b'x' * 200000
+        verdict = plan.evaluate(make_response(body=page))
+        assert verdict.status == 'taken'
+        assert verdict.body_bytes < 20000
+
+    def test_json_predicates(self):
+        plan = plan_for([
+            {'json': {'path': 'data.users.0.name', 'equals': 'josh'}, 'result': 'taken'},
+            {'json': {'path': 'data.users', 'truthy': False}, 'result': 'available'},
+            {'json': {}, 'result': 'unknown'},
+        ], default='taken')
+        assert plan.evaluate(make_response(body=b'{"data": {"users": [{"name": "josh"}]}}')).status == 'taken'
+        assert plan.evaluate(make_response(body=b'{"data": {"users": []}}')).status == 'available'
+        assert plan.evaluate(make_response(body=b'{"data": {"users": [{"name": "ann"}]}}')).status == 'unknown'
+        assert plan.evaluate(make_response(body=b'<html>')).status == 'taken'
+
+    def test_redirect_target(self):
+        plan = plan_for([{'redirect': ['/login'], 'result': 'available'}], default='taken')
+        response = make_response(302, headers={'Location': '/login?next=/josh'})
+        assert plan.evaluate(response).status == 'available'
+
+
+class TestBodyCap:
+    def test_body_of_exactly_max_bytes_is_not_capped(self):
+        plan = plan_for([{'body': ['missing'], 'result': 'available'}], default='taken', max_body_bytes=64)
+        verdict = plan.evaluate(make_response(body=b'x' * 64))
+        assert verdict == (plan.default, 64, True, False)
+
+    def test_longer_body_is_capped(self):
+        plan = plan_for([{'body': ['missing'], 'result': 'available'}], default='taken', max_body_bytes=64)
+        verdict = plan.evaluate(make_response(body=b'x' * 65 + b'missing'))
+        assert verdict == ('taken', 64, False, True)
+
+    def test_capped_body_is_not_parsed_as_json(self):
+        plan = plan_for([{'json': {'path': 'a', 'exists': False}, 'result': 'available'}],
+                        default='taken', max_body_bytes=8)
+        assert plan.evaluate(make_response(body=b'{"b": 1}')).status == 'available'
+        assert plan.evaluate(make_response(body=b'{"b": 1, "c": 2}')).status == 'taken'
+
+    def test_capped_state_is_not_complete(self):
+        state = BodyState()
+        state.feed(b'{"a": 1')
+        state.finish(truncated=True)
+        assert not state.complete
+        assert state.settled
+        assert state.json() is None
+        assert state.title() is None
@@ -0,0 +1,226 @@
+"""iter_check() against a local HTTP server: deadlines and cancellation."""
+
+import asyncio
+import http.server
+import os
+import signal
+import threading
+import time
+
+import pytest
+
+from username_checker import ScanInterrupted, UsernameChecker
+
+
+class Handler(http.server.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        if self.path.startswith('/slow/'):
+            time.sleep(3)
+        elif self.path.startswith('/flaky/'):
+            self.send_response(503)
+            self.send_header('Retry-After', '5')
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('Content-Length', '2')
+        self.end_headers()
+        self.wfile.write(b'ok')
+
+
+@pytest.fixture(scope='module')
+def server():
+    httpd = http.server.ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    httpd.daemon_threads = True
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+
+
+def make_checker(server, paths, **options):
+    checker = UsernameChecker(delay=0, **options)
+    checker.platforms = {
+        f"{path.title()}{i}": {'url_pattern': f"{server}/{path}/{i}/{{username}}",
+                               'checker_type': 'standard', 'category': path}
+        for i, path in enumerate(paths)
+    }
+    return checker
+
+
+def pool_threads():
+    return [t for t in threading.enumerate() if t.name.startswith('ThreadPoolExecutor')]
+
+
+def wait_for_pool_exit(limit):
+    end = time.monotonic() + limit
+    while pool_threads() and time.monotonic() < end:
+        time.sleep(0.05)
+    return not pool_threads()
+
+
+def test_completes_without_deadline(server):
+    checker = make_checker(server, ['fast', 'fast', 'fast'])
+    results = list(checker.iter_check(['josh', 'ann']))
+    assert len(results) == 6
+    assert {r['status'] for r in results} == {'taken'}
+
+
+def test_deadline_returns_partial_results_on_time(server):
+    checker = make_checker(server, ['fast', 'slow', 'slow', 'slow'], timeout=10)
+    start = time.monotonic()
+    results = {r['platform']: r for r in checker.iter_check('josh', deadline=0.5)}
+    elapsed = time.monotonic() - start
+
+    assert elapsed < 1.5
+    assert results['Fast0']['status'] == 'taken'
+    for name in ('Slow1', 'Slow2', 'Slow3'):
+        assert results[name]['status'] == 'timeout'
+        assert results[name]['error'] == 'Deadline of 0.5s reached'
+
+    # In-flight requests are cut off at the deadline instead of running
+    # for the full 10s timeout (or the 3s the server takes)
+    assert wait_for_pool_exit(2.0)
+
+
+def test_deadline_stops_retry_backoff(server):
+    checker = make_checker(server, ['flaky'], timeout=10)
+    start = time.monotonic()
+    [result] = checker.iter_check('josh', deadline=0.5)
+    assert result['status'] == 'timeout'
+    assert time.monotonic() - start < 1.5
+    assert wait_for_pool_exit(1.0)
+
+
+def ctrl_c_after(seconds):
+    timer = threading.Timer(seconds, os.kill, (os.getpid(), signal.SIGINT))
+    timer.start()
+    return timer
+
+
+def test_ctrl_c_yields_partial_results_then_raises(server):
+    checker = make_checker(server, ['fast', 'slow', 'slow'])
+    results = []
+    ctrl_c_after(0.5)
+    with pytest.raises(KeyboardInterrupt) as excinfo:
+        for result in checker.iter_check('josh'):
+            results.append(result)
+    assert isinstance(excinfo.value, ScanInterrupted)
+    assert {r['platform']: r['status'] for r in results} == {
+        'Fast0': 'taken', 'Slow1': 'timeout', 'Slow2': 'timeout'}
+
+
+def test_check_username_attaches_partial_results(server, capsys):
+    checker = make_checker(server, ['slow', 'fast'])
+    ctrl_c_after(0.5)
+    with pytest.raises(ScanInterrupted) as excinfo:
+        checker.check_username('josh')
+    assert [(r['platform'], r['status']) for r in excinfo.value.results] == [
+        ('Fast1', 'taken'), ('Slow0', 'timeout')]
+
+
+def test_slow_consumer_gets_timeouts_not_errors_after_deadline(server):
+    checker = make_checker(server, ['fast'] * 20, max_workers=4)
+    results = checker.check_username('josh', deadline=0.3, on_result=lambda result: time.sleep(0.1))
+
+    statuses = [r['status'] for r in results]
+    assert len(statuses) == 20
+    assert 'error' not in statuses
+    assert 'taken' in statuses and 'timeout' in statuses
+
+
+def test_check_platform_works_after_early_stop(server):
+    checker = make_checker(server, ['fast', 'slow', 'fast'])
+    scan = checker.iter_check('josh')
+    next(scan)
+    scan.close()
+    assert checker.check_platform('Fast0', 'josh')['status'] == 'taken'
+    assert checker.check_platform('Fast2', 'josh')['status'] == 'taken'
+
+
+def producer_threads():
+    return [t for t in threading.enumerate() if t.name == 'iter-check']
+
+
+def wait_for_producer_exit(limit):
+    end = time.monotonic() + limit
+    while producer_threads() and time.monotonic() < end:
+        time.sleep(0.05)
+    return not producer_threads()
+
+
+def test_aiter_check_holds_back_checks_for_a_slow_consumer(server):
+    checker = make_checker(server, ['fast'] * 30, max_workers=1)
+
+    async def consume():
+        scan = checker.aiter_check('josh', max_pending=2)
+        first = await scan.__anext__()
+        await asyncio.sleep(0.5)
+        started = checker.checkers['standard'].transfer.responses
+        rest = [result async for result in scan]
+        return first, started, rest
+
+    first, started, rest = asyncio.run(consume())
+    # Consumed, queued (max_pending), held by the producer, in flight (2 * max_workers)
+    assert started <= 1 + 2 + 1 + 2
+    assert len(rest) == 29
+    assert {r['status'] for r in [first] + rest} == {'taken'}
+
+
+@pytest.mark.parametrize('stop', ['break', 'aclose'])
+def test_aiter_check_early_exit_stops_producer(server, stop):
+    checker = make_checker(server, ['fast'] + ['slow'] * 4, max_workers=2)
+
+    async def consume():
+        scan = checker.aiter_check('josh', max_pending=1)
+        async for result in scan:
+            break
+        if stop == 'aclose':
+            await scan.aclose()
+            assert wait_for_producer_exit(1.0)
+        return result
+
+    assert asyncio.run(consume())['platform'] == 'Fast0'
+    assert wait_for_producer_exit(1.0)
+    # Queued checks are cancelled instead of running on without a consumer
+    assert wait_for_pool_exit(4.0)
+
+
+def test_aiter_check_raises_producer_errors():
+    checker = UsernameChecker(delay=0)
+
+    async def consume():
+        return [result async for result in checker.aiter_check('josh', platforms=['NoSuchSite'])]
+
+    with pytest.raises(ValueError, match='No platforms found'):
+        asyncio.run(consume())
+    assert wait_for_producer_exit(1.0)
+
+
+def test_aiter_check_raises_errors_after_partial_results(server, monkeypatch):
+    checker = make_checker(server, ['fast'] * 5, max_workers=1)
+    collect = checker._collect
+    calls = []
+
+    def failing_collect(future, in_flight):
+        calls.append(future)
+        if len(calls) == 3:
+            raise RuntimeError('results lost')
+        return collect(future, in_flight)
+
+    monkeypatch.setattr(checker, '_collect', failing_collect)
+    received = []
+
+    async def consume():
+        async for result in checker.aiter_check('josh'):
+            received.append(result)
+
+    with pytest.raises(RuntimeError, match='results lost'):
+        asyncio.run(consume())
+    assert len(received) == 2
+    assert wait_for_producer_exit(1.0)
@@ -0,0 +1,180 @@
+"""Watcher scheduling, change events and persisted state."""
+
+import logging
+
+import pytest
+
+from watcher import Watcher
+
+PLATFORMS = {'GitHub': {'category': 'developer'}, 'Steam': {'category': 'gaming'}}
+
+
+class StubChecker:
+    """Platform filter plus scripted statuses per (username, platform)."""
+
+    def __init__(self, statuses=None):
+        self.max_workers = 4
+        self.logger = logging.getLogger('test_watcher')
+        self.statuses = statuses or {}
+        self.calls = []
+
+    def filter_platforms(self, category=None, platforms=None):
+        selected = dict(PLATFORMS)
+        if category:
+            selected = {k: v for k, v in selected.items() if v['category'] == category}
+        if platforms:
+            selected = {k: v for k, v in selected.items() if k in platforms}
+        return selected
+
+    def check_platform(self, platform_name, username, platform_config=None):
+        self.calls.append((username, platform_name))
+        status = self.statuses[(username, platform_name)].pop(0)
+        return {'platform': platform_name, 'username': username, 'status': status,
+                'url': f"https://example.com/{username}", 'category': 'test'}
+
+
+class ListSink:
+    def __init__(self):
+        self.events = []
+
+    def emit(self, event):
+        self.events.append(event)
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def state_path(tmp_path):
+    return str(tmp_path / 'watch_state.json')
+
+
+def make_watcher(state_path, checker=None, sink=None):
+    return Watcher(checker or StubChecker(), state_path, sink or ListSink(),
+                   min_interval=100, max_interval=1000, backoff=2.0)
+
+
+def result(status):
+    return {'status': status, 'url': 'https://example.com/josh', 'category': 'developer'}
+
+
+def test_sync_schedules_new_pairs_and_drops_removed_ones(state_path):
+    watcher = make_watcher(state_path)
+    assert watcher.sync([('josh', None), ('ann', ['Steam'])]) == 3
+    assert sorted(watcher.entries) == ['ann|Steam', 'josh|GitHub', 'josh|Steam']
+    assert watcher.sync([('josh', None)], category='developer') == 1
+    assert list(watcher.entries) == ['josh|GitHub']
+    assert len(watcher._pop_due(float('inf'), 10)) == 1
+
+
+def test_first_check_sets_baseline_without_event(state_path):
+    sink = ListSink()
+    watcher = make_watcher(state_path, sink=sink)
+    watcher.sync([('josh', ['GitHub'])])
+    watcher._record('josh|GitHub', result('taken'))
+    assert sink.events == []
+    assert watcher.entries['josh|GitHub']['status'] == 'taken'
+    assert watcher.entries['josh|GitHub']['last_changed'] is None
+
+
+def test_change_emits_exactly_one_event_and_resets_interval(state_path):
+    sink = ListSink()
+    watcher = make_watcher(state_path, sink=sink)
+    watcher.sync([('josh', ['GitHub'])])
+    watcher._record('josh|GitHub', result('taken'))
+    watcher._record('josh|GitHub', result('taken'))
+    assert watcher.entries['josh|GitHub']['interval'] == 400
+
+    watcher._record('josh|GitHub', result('available'))
+    watcher._record('josh|GitHub', result('available'))
+    assert len(sink.events) == 1
+    event = sink.events[0]
+    assert (event['username'], event['platform'], event['old_status'], event['new_status']) == (
+        'josh', 'GitHub', 'taken', 'available')
+    assert watcher.entries['josh|GitHub']['interval'] == 200
+    assert watcher.events_emitted == 1
+
+
+def test_interval_backs_off_up_to_max(state_path):
+    watcher = make_watcher(state_path)
+    watcher.sync([('josh', ['GitHub'])])
+    intervals = []
+    for _ in range(6):
+        watcher._record('josh|GitHub', result('taken'))
+        intervals.append(watcher.entries['josh|GitHub']['interval'])
+    assert intervals == [200, 400, 800, 1000, 1000, 1000]
+
+
+def test_unknown_keeps_status_and_interval(state_path):
+    sink = ListSink()
+    watcher = make_watcher(state_path, sink=sink)
+    watcher.sync([('josh', ['GitHub'])])
+    watcher._record('josh|GitHub', result('taken'))
+    watcher._record('josh|GitHub', result('taken'))
+    before = watcher.entries['josh|GitHub']['next_check']
+
+    watcher._record('josh|GitHub', result('unknown'))
+    entry = watcher.entries['josh|GitHub']
+    assert (entry['status'], entry['interval']) == ('taken', 400)
+    # Retried on the short interval, not the learned one
+    assert entry['next_check'] - entry['last_checked'] <= 100 * 1.1
+    assert entry['next_check'] != before
+
+    watcher._record('josh|GitHub', result('error'))
+    watcher._record('josh|GitHub', result('taken'))
+    assert sink.events == []
+    assert watcher.entries['josh|GitHub']['interval'] == 800
+
+
+def test_stale_heap_items_are_skipped(state_path):
+    watcher = make_watcher(state_path)
+    watcher.sync([('josh', ['GitHub']), ('ann', ['GitHub'])])
+    # Each record pushes a new heap item; the original ones are now stale
+    watcher._record('josh|GitHub', result('taken'))
+    watcher._record('josh|GitHub', result('taken'))
+    del watcher.entries['ann|GitHub']
+    assert len(watcher.schedule) == 4
+
+    assert watcher._pop_due(float('inf'), 10) == ['josh|GitHub']
+    assert watcher.schedule == []
+
+
+def test_pop_due_respects_time_and_limit(state_path):
+    watcher = make_watcher(state_path)
+    watcher.sync([('josh', None), ('ann', None)])
+    now = max(entry['next_check'] for entry in watcher.entries.values())
+    assert watcher._pop_due(now - 1000, 10) == []
+    assert len(watcher._pop_due(now, 3)) == 3
+    assert len(watcher._pop_due(now, 3)) == 1
+
+
+def test_state_survives_save_and_reload(state_path):
+    sink = ListSink()
+    watcher = make_watcher(state_path, sink=sink)
+    watcher.sync([('josh', ['GitHub', 'Steam'])])
+    watcher._record('josh|GitHub', result('taken'))
+    watcher._record('josh|GitHub', result('taken'))
+    watcher.save_state()
+    assert not watcher.dirty
+
+    reloaded = make_watcher(state_path, sink=sink)
+    assert reloaded.entries == watcher.entries
+    assert reloaded.sync([('josh', ['GitHub', 'Steam'])]) == 2
+    assert reloaded.entries['josh|GitHub']['interval'] == 400
+
+    # The persisted baseline means the next change is reported
+    reloaded._record('josh|GitHub', result('available'))
+    assert [e['new_status'] for e in sink.events] == ['available']
+
+
+def test_run_once_checks_due_pairs_and_saves(state_path):
+    checker = StubChecker({('josh', 'GitHub'): ['taken'], ('josh', 'Steam'): ['available']})
+    watcher = make_watcher(state_path, checker=checker)
+    watcher.sync([('josh', None)])
+    watcher.run(once=True)
+    assert sorted(checker.calls) == [('josh', 'GitHub'), ('josh', 'Steam')]
+    assert watcher.checks_run == 2
+
+    reloaded = make_watcher(state_path)
+    assert {key: entry['status'] for key, entry in reloaded.entries.items()} == {
+        'josh|GitHub': 'taken', 'josh|Steam': 'available'}
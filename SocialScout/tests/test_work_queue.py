@@ -0,0 +1,114 @@
+"""SQLite work queue: exactly-once completion across worker processes and lease expiry."""
+
+import logging
+import multiprocessing
+import threading
+import time
+
+import pytest
+
+from work_queue import QueueWorker, SQLiteQueue
+
+PLATFORMS = {f"Site{i}": {'url_pattern': f"https://site{i}.example/{{username}}", 'category': 'test'}
+             for i in range(8)}
+USERNAMES = ['alice', 'bob', 'carol', 'dave']
+
+
+class FakeChecker:
+    """Just enough of UsernameChecker for QueueWorker, without the network."""
+
+    def __init__(self, max_workers=4, fail_on=None):
+        self.max_workers = max_workers
+        self.platforms = PLATFORMS
+        self.logger = logging.getLogger('test_work_queue')
+        self.fail_on = fail_on
+
+    def check_platform(self, platform_name, username, platform_config=None):
+        if platform_name == self.fail_on:
+            raise RuntimeError('database is locked')
+        time.sleep(0.01)
+        return {'platform': platform_name, 'username': username, 'status': 'taken',
+                'url': platform_config['url_pattern'].format(username=username),
+                'response_time': 10, 'category': 'test'}
+
+
+def _work(path, worker_id, counts):
+    with SQLiteQueue(path) as queue:
+        worker = QueueWorker(queue, FakeChecker(), worker_id, batch_size=3, lease_seconds=1,
+                             host_interval=0.001, poll_interval=0.1)
+        worker.run(exit_when_empty=True)
+        counts.put((worker_id, worker.completed, worker.duplicates, worker.failed))
+
+
+@pytest.fixture
+def queue_path(tmp_path):
+    return str(tmp_path / 'queue.db')
+
+
+def _tasks():
+    return [(username, platform) for username in USERNAMES for platform in PLATFORMS]
+
+
+def test_workers_complete_every_task_exactly_once(queue_path):
+    with SQLiteQueue(queue_path) as queue:
+        assert queue.enqueue(_tasks()) == len(_tasks())
+        assert queue.enqueue(_tasks()) == 0
+        # A worker that dies holding leases; they must expire and be re-leased
+        abandoned = queue.lease('dead-worker', limit=5, lease_seconds=0.5)
+        assert len(abandoned) == 5
+
+    counts = multiprocessing.Queue()
+    processes = [multiprocessing.Process(target=_work, args=(queue_path, f"worker-{i}", counts))
+                 for i in range(3)]
+    for process in processes:
+        process.start()
+    reports = [counts.get(timeout=60) for _ in processes]
+    for process in processes:
+        process.join(timeout=10)
+        assert process.exitcode == 0
+
+    assert sum(completed for _, completed, _, _ in reports) == len(_tasks())
+    assert all(failed == 0 for *_, failed in reports)
+
+    with SQLiteQueue(queue_path) as queue:
+        stats = queue.stats()
+        assert (stats['done'], stats['pending'], stats['leased'], stats['failed']) == (len(_tasks()), 0, 0, 0)
+        results = queue.results()
+        assert sorted((r['username'], r['platform']) for r in results) == sorted(_tasks())
+
+        rows = queue.conn.execute(
+            'SELECT attempts, worker FROM tasks WHERE id IN (%s)' % ','.join('?' * len(abandoned)),
+            [task[0] for task in abandoned]).fetchall()
+        assert all(attempts == 2 and worker.startswith('worker-') for attempts, worker in rows)
+
+        # The dead worker's late result is ignored
+        assert not queue.complete(abandoned[0][0], {'status': 'available'}, 'dead-worker')
+
+
+def test_extend_and_complete_require_the_lease_holder(queue_path):
+    with SQLiteQueue(queue_path) as queue:
+        queue.enqueue([('alice', 'Site0')])
+        [(task_id, _, _)] = queue.lease('a', lease_seconds=0.2)
+        queue.extend([task_id], 'b', lease_seconds=60)
+        time.sleep(0.3)
+        assert [task[0] for task in queue.lease('b', lease_seconds=60)] == [task_id]
+        assert not queue.complete(task_id, {'status': 'taken'}, 'a')
+        assert queue.complete(task_id, {'status': 'taken'}, 'b')
+        assert not queue.complete(task_id, {'status': 'taken'}, 'b')
+
+
+def test_failed_task_is_left_to_lease_expiry(queue_path):
+    with SQLiteQueue(queue_path) as queue:
+        queue.enqueue([('alice', 'Site0'), ('alice', 'Site1'), ('bob', 'Site1')])
+        worker = QueueWorker(queue, FakeChecker(fail_on='Site1'), 'w', lease_seconds=60, host_interval=0)
+        stop = threading.Event()
+        results = []
+
+        def on_result(result):
+            results.append(result)
+            stop.set()
+
+        worker.run(stop, on_result=on_result)
+        assert (worker.completed, worker.failed) == (1, 2)
+        assert [r['platform'] for r in results] == ['Site0']
+        assert queue.stats()['leased'] == 2
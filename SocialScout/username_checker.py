@@ -2,65 +2,117 @@
 Main username checker class that coordinates the checking process.
 """
 
-import json
-import os
+import asyncio
+import itertools
+import logging
 import time
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from threading import Lock
-from colorama import Fore, Style
-import requests
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from threading import Event, Lock, Semaphore, Thread
 from checkers import (
+    CheckStopped,
     StandardChecker, 
     ProfileChecker, 
     APIChecker, 
     SocialMediaChecker,
     RedirectChecker
 )
-from utils import setup_logging, RateLimiter
+from utils import RateLimiter
+from retry import RetryPolicy, RetryBudget
+from progress import ProgressRenderer
+import profiler
+import catalog
+
+# How often a scan waiting on slow checks looks for an outside cancel
+CANCEL_POLL_INTERVAL = 0.1
+
+CHECKER_CLASSES = {
+    'standard': StandardChecker,
+    'profile': ProfileChecker,
+    'api': APIChecker,
+    'social_media': SocialMediaChecker,
+    'redirect': RedirectChecker
+}
+
+class ScanInterrupted(KeyboardInterrupt):
+    """
+    Ctrl-C during a scan, raised once the partial results have been delivered.
+    
+    check_username() attaches the results it collected; from iter_check()
+    they were already yielded, so ``results`` is None.
+    """
+    
+    def __init__(self, results=None):
+        super().__init__("Scan interrupted")
+        self.results = results
 
 class UsernameChecker:
-    def __init__(self, timeout=10, max_workers=50, delay=0.1, verbose=False, debug=False):
+    def __init__(self, timeout=10, max_workers=50, delay=0.1, verbose=False, debug=False,
+                 prewarm=False, transport=None, retry_policy=None):
         self.timeout = timeout
         self.max_workers = max_workers
         self.delay = delay
         self.verbose = verbose
         self.debug = debug
+        self.prewarm = prewarm
+        self.prewarm_report = None
+        # Optional object whose mount(session) swaps the HTTP transport of
+        # every checker session (see cassette.CassetteTransport)
+        self.transport = transport
+        # Shared by every checker so the retry budget is global to the scan
+        self.retry_policy = retry_policy if retry_policy is not None else RetryPolicy(budget=RetryBudget())
         
-        # Setup logging
-        self.logger = setup_logging(debug)
+        # Logging is configured by the application (see utils.setup_logging)
+        self.logger = logging.getLogger(__name__)
         
         # Load platforms configuration
         self.platforms = self._load_platforms()
         
-        # Initialize checkers
-        self.checkers = {
-            'standard': StandardChecker(timeout),
-            'profile': ProfileChecker(timeout),
-            'api': APIChecker(timeout),
-            'social_media': SocialMediaChecker(timeout),
-            'redirect': RedirectChecker(timeout)
-        }
+        # Checkers (and their HTTP sessions) are created on first use, so a
+        # scan only pays for the checker types its platforms actually need
+        self.checkers = {}
+        self.checkers_lock = Lock()
         
         # Rate limiter
         self.rate_limiter = RateLimiter(delay)
         
         # Progress tracking
-        self.progress_lock = Lock()
-        self.completed = 0
+        self.progress = None
         self.total = 0
+        
+        # Set when a scan stops early; queued checks then bail out
+        # instead of making requests nobody will collect. Each scan gets a
+        # fresh one, and checks outside a scan see one that is never set
+        self.cancel_event = Event()
+        # Monotonic end of the current scan's deadline, shared with checkers
+        self.stop_at = None
     
     def _load_platforms(self):
-        """Load platform configurations from JSON file."""
+        """Load platform configurations from the (precompiled) catalog."""
         try:
-            platforms_path = os.path.join(os.path.dirname(__file__), 'platforms.json')
-            with open(platforms_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            return catalog.load_platforms()
         except Exception as e:
             self.logger.error(f"Failed to load platforms.json: {e}")
             raise
     
-    def _filter_platforms(self, category=None, platforms=None):
-        """Filter platforms based on category or specific platform names."""
+    def _get_checker(self, checker_type):
+        """Return the checker for a type, creating it on first use."""
+        if checker_type not in CHECKER_CLASSES:
+            checker_type = 'standard'
+        checker = self.checkers.get(checker_type)
+        if checker is None:
+            with self.checkers_lock:
+                checker = self.checkers.get(checker_type)
+                if checker is None:
+                    checker = CHECKER_CLASSES[checker_type](self.timeout, self.retry_policy,
+                                                            self.cancel_event)
+                    checker.stop_at = self.stop_at
+                    if self.transport is not None:
+                        self.transport.mount(checker.session)
+                    self.checkers[checker_type] = checker
+        return checker
+    
+    def filter_platforms(self, category=None, platforms=None):
+        """Platforms matching a category and/or specific platform names; may be empty."""
         filtered = self.platforms.copy()
         
         if category:
@@ -74,45 +126,71 @@ class UsernameChecker:
         
         return filtered
     
-    def _update_progress(self, platform_name, status):
-        """Update progress counter and display."""
-        with self.progress_lock:
-            self.completed += 1
-            if self.verbose and status != 'error':  # Don't show errors in verbose mode
-                percentage = (self.completed / self.total) * 100
-                if status == 'available':
-                    status_color = Fore.GREEN
-                    status_symbol = "✅"
-                elif status == 'taken':
-                    status_color = Fore.RED
-                    status_symbol = "❌"
-                else:
-                    status_color = Fore.YELLOW
-                    status_symbol = "❓"
-                print(f"[{percentage:5.1f}%] {status_symbol} {platform_name}: {status_color}{Style.BRIGHT}{status.upper()}{Style.RESET_ALL}")
+    def prewarm_hosts(self, platforms_to_check, username):
+        """
+        Resolve and connect to every scheduled host before probing starts.
+        
+        Returns the dns_cache.prewarm() report, also kept as prewarm_report.
+        """
+        from dns_cache import prewarm
+        
+        targets = []
+        for config in platforms_to_check.values():
+            checker_type = config.get('checker_type', 'standard')
+            pattern = config.get('api_url') if checker_type == 'api' else None
+            pattern = pattern or config.get('url_pattern', '')
+            targets.append((self._get_checker(checker_type).session, pattern.format(username=username)))
+        self.prewarm_report = prewarm(targets, max_workers=self.max_workers, timeout=self.timeout)
+        return self.prewarm_report
+    
+    def _update_progress(self, platform_name, status, category='unknown'):
+        """Hand a finished check to the progress renderer (never blocks)."""
+        if self.progress is not None:
+            self.progress.post(platform_name, status, category)
     
     def _check_single_platform(self, platform_name, platform_config, username):
         """Check username availability on a single platform."""
+        result = self.check_platform(platform_name, username, platform_config)
+        
+        # Update progress
+        self._update_progress(platform_name, result['status'], result.get('category', 'unknown'))
+        
+        return result
+    
+    def check_platform(self, platform_name, username, platform_config=None):
+        """
+        Check one (username, platform) pair without touching progress state.
+        
+        Errors are reported as a result with status 'error' rather than raised,
+        so long-running callers such as watch mode can keep going.
+        """
+        if platform_config is None:
+            platform_config = self.platforms[platform_name]
+        
+        checker_type = platform_config.get('checker_type', 'standard')
+        cancel_event = self.cancel_event
         try:
-            # Rate limiting
-            self.rate_limiter.wait()
-            
-            # Get appropriate checker
-            checker_type = platform_config.get('checker_type', 'standard')
-            checker = self.checkers.get(checker_type, self.checkers['standard'])
-            
-            # Perform the check
-            result = checker.check(platform_name, platform_config, username)
-            
-            # Update progress
-            self._update_progress(platform_name, result['status'])
-            
+            with profiler.platform(platform_name, checker_type):
+                # Rate limiting
+                self.rate_limiter.wait(cancel_event)
+                if cancel_event.is_set():
+                    return self._timeout_result(platform_name, platform_config, username, "Scan cancelled")
+                
+                # Get appropriate checker
+                checker = self._get_checker(checker_type)
+                
+                # Perform the check
+                return checker.check(platform_name, platform_config, username)
+        
+        except CheckStopped as e:
+            result = self._timeout_result(platform_name, platform_config, username, str(e))
+            if e.retries:
+                result['retries'] = e.retries
             return result
-            
         except Exception as e:
             if self.debug:
                 self.logger.error(f"Error checking {platform_name}: {e}")
-            error_result = {
+            result = {
                 'platform': platform_name,
                 'username': username,
                 'status': 'error',
@@ -121,69 +199,271 @@ class UsernameChecker:
                 'error': str(e),
                 'category': platform_config.get('category', 'unknown')
             }
-            self._update_progress(platform_name, 'error')
-            return error_result
+            if getattr(e, 'retries', 0):
+                result['retries'] = e.retries
+            return result
+    
+    def _set_limits(self, cancel_event, stop_at):
+        """Hand a scan's cancel event and deadline to every checker."""
+        with self.checkers_lock:
+            self.cancel_event = cancel_event
+            self.stop_at = stop_at
+            for checker in self.checkers.values():
+                checker.cancel_event = cancel_event
+                checker.stop_at = stop_at
+    
+    def _cancel(self):
+        """Stop in-flight checks: no more attempts or backoff, idle connections closed."""
+        self.cancel_event.set()
+        for checker in list(self.checkers.values()):
+            checker.session.close()
+    
+    def _timeout_result(self, platform_name, platform_config, username, reason):
+        return {
+            'platform': platform_name,
+            'username': username,
+            'status': 'timeout',
+            'url': platform_config.get('url_pattern', '').format(username=username),
+            'response_time': 0,
+            'error': reason,
+            'category': platform_config.get('category', 'unknown')
+        }
+    
+    def _collect(self, future, in_flight):
+        """Result of a finished check, or None if it failed unexpectedly."""
+        platform_name = in_flight.pop(future)[1]
+        try:
+            return future.result()
+        except Exception as e:
+            self.logger.error(f"Unexpected error for {platform_name}: {e}")
+            return None
+    
+    def select_platforms(self, category=None, platforms=None):
+        """Platforms a scan with these filters would check; raises ValueError if none."""
+        selected = self.filter_platforms(category, platforms)
+        if not selected:
+            raise ValueError("No platforms found matching the specified criteria")
+        return selected
     
-    def check_username(self, username, category=None, platforms=None):
+    def iter_check(self, usernames, category=None, platforms=None, deadline=None, cancel_event=None):
+        """
+        Yield results for every (username, platform) pair as they complete.
+        
+        Nothing is printed. Checks are submitted lazily, at most twice the
+        worker count ahead of the consumer, so a slow consumer holds back
+        new requests instead of piling up results, and closing the generator
+        early cancels whatever has not started.
+        
+        Args:
+            usernames: A username or an iterable of usernames
+            category: Filter by platform category
+            platforms: List of specific platforms to check
+            deadline: Optional time budget in seconds. When it runs out (or
+                on Ctrl-C) queued checks are cancelled and every unfinished
+                pair is yielded with status 'timeout'. Request timeouts are
+                capped at the time left, and in-flight checks stop retrying,
+                so worker threads finish shortly after the deadline too
+            cancel_event: Optional Event another thread may set to stop the
+                scan the same way, with 'Scan cancelled' as the reason
+        
+        Raises:
+            ScanInterrupted: On Ctrl-C, after the 'timeout' results
+        """
+        if isinstance(usernames, str):
+            usernames = [usernames]
+        selected = self.select_platforms(category, platforms)
+        pairs = ((username, name, config) for username in usernames
+                 for name, config in selected.items())
+        
+        if self.prewarm:
+            first = next(pairs, None)
+            if first is None:
+                return
+            self.prewarm_hosts(selected, first[0])
+            pairs = itertools.chain([first], pairs)
+        
+        cancel_event = cancel_event if cancel_event is not None else Event()
+        stop_at = time.monotonic() + deadline if deadline is not None else None
+        self._set_limits(cancel_event, stop_at)
+        window = self.max_workers * 2
+        in_flight = {}
+        # Finished checks not yet yielded when the deadline cut in
+        ready = []
+        stopped = None
+        interrupted = False
+        
+        def expired():
+            return stop_at is not None and time.monotonic() >= stop_at
+        
+        # Not used as a context manager: stopping early must not wait for
+        # requests that are already in flight
+        executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        try:
+            while True:
+                # Checked here too: a slow consumer can hold the generator
+                # past the deadline, and nothing new should start after it
+                if expired():
+                    stopped = f"Deadline of {deadline}s reached"
+                    break
+                if cancel_event.is_set():
+                    stopped = "Scan cancelled"
+                    break
+                while len(in_flight) < window:
+                    pair = next(pairs, None)
+                    if pair is None:
+                        break
+                    future = executor.submit(self._check_single_platform, pair[1], pair[2], pair[0])
+                    in_flight[future] = pair
+                if not in_flight:
+                    break
+                
+                timeout = CANCEL_POLL_INTERVAL
+                if stop_at is not None:
+                    timeout = min(timeout, max(stop_at - time.monotonic(), 0))
+                try:
+                    done, _ = wait(in_flight, timeout=timeout, return_when=FIRST_COMPLETED)
+                except KeyboardInterrupt:
+                    interrupted = True
+                    stopped = "Scan interrupted"
+                    break
+                if not done:
+                    # Deadline and cancellation are checked at the top
+                    continue
+                
+                ready = list(done)
+                while ready and not expired():
+                    result = self._collect(ready.pop(), in_flight)
+                    if result is not None:
+                        yield result
+        finally:
+            if stopped or in_flight:
+                self._cancel()
+            executor.shutdown(wait=False, cancel_futures=True)
+            # Checks still running keep the (now set) event they started with
+            self._set_limits(Event(), None)
+        
+        if stopped:
+            for future in ready:
+                result = self._collect(future, in_flight)
+                if result is not None:
+                    yield result
+            for username, name, config in itertools.chain(in_flight.values(), pairs):
+                yield self._timeout_result(name, config, username, stopped)
+        if interrupted:
+            raise ScanInterrupted()
+    
+    async def aiter_check(self, usernames, category=None, platforms=None, deadline=None, max_pending=100):
+        """
+        Async iterator over iter_check() results, for use with ``async for``.
+        
+        Checks run on the usual worker threads; at most ``max_pending``
+        results wait for the consumer before the producer blocks, which in
+        turn stops new checks from being submitted. Leaving the loop early
+        (break or aclose) cancels the scan.
+        """
+        loop = asyncio.get_running_loop()
+        results = asyncio.Queue()
+        slots = Semaphore(max_pending)
+        stop = Event()
+        # Wakes the scan if it is waiting on slow checks when the consumer leaves
+        cancel_event = Event()
+        done = object()
+        
+        def produce():
+            generator = self.iter_check(usernames, category, platforms, deadline, cancel_event)
+            try:
+                for result in generator:
+                    while not slots.acquire(timeout=0.1):
+                        if stop.is_set():
+                            return
+                    if stop.is_set():
+                        return
+                    loop.call_soon_threadsafe(results.put_nowait, result)
+                loop.call_soon_threadsafe(results.put_nowait, done)
+            except BaseException as e:
+                if not stop.is_set():
+                    loop.call_soon_threadsafe(results.put_nowait, e)
+            finally:
+                generator.close()
+        
+        producer = Thread(target=produce, name='iter-check', daemon=True)
+        producer.start()
+        try:
+            while True:
+                item = await results.get()
+                if item is done:
+                    return
+                if isinstance(item, BaseException):
+                    raise item
+                slots.release()
+                yield item
+        finally:
+            stop.set()
+            cancel_event.set()
+            slots.release()
+    
+    def check_username(self, username, category=None, platforms=None, on_result=None, deadline=None):
         """
         Check username availability across filtered platforms.
         
+        Shows a progress line while running; use iter_check() for a scan
+        without any terminal output.
+        
         Args:
             username: Username to check
             category: Filter by platform category
             platforms: List of specific platforms to check
+            on_result: Optional callable invoked with each result as it
+                completes, from the collecting thread rather than a worker
+            deadline: Optional time budget in seconds; unfinished platforms
+                are reported with status 'timeout' (see iter_check)
             
         Returns:
             List of result dictionaries
-        """
-        # Filter platforms
-        platforms_to_check = self._filter_platforms(category, platforms)
         
-        if not platforms_to_check:
-            raise ValueError("No platforms found matching the specified criteria")
+        Raises:
+            ScanInterrupted: On Ctrl-C, carrying the sorted partial results
+        """
+        platforms_to_check = self.select_platforms(category, platforms)
         
         self.total = len(platforms_to_check)
-        self.completed = 0
-        
-        print(f"{Fore.CYAN}{Style.BRIGHT}🔍 Scanning {self.total} platforms...{Style.RESET_ALL}")
-        if category:
-            print(f"{Fore.MAGENTA}📂 Category filter: {Style.BRIGHT}{category}{Style.RESET_ALL}")
-        if platforms:
-            print(f"{Fore.MAGENTA}🎯 Platform filter: {Style.BRIGHT}{', '.join(platforms)}{Style.RESET_ALL}")
-        print()
+        category_totals = {}
+        for config in platforms_to_check.values():
+            platform_category = config.get('category', 'unknown')
+            category_totals[platform_category] = category_totals.get(platform_category, 0) + 1
         
         results = []
-        
-        # Use ThreadPoolExecutor for concurrent checking
-        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-            # Submit all tasks
-            future_to_platform = {
-                executor.submit(self._check_single_platform, name, config, username): name
-                for name, config in platforms_to_check.items()
-            }
-            
-            # Collect results as they complete
-            for future in as_completed(future_to_platform):
-                try:
-                    result = future.result()
-                    results.append(result)
-                except Exception as e:
-                    platform_name = future_to_platform[future]
-                    self.logger.error(f"Unexpected error for {platform_name}: {e}")
+        self.progress = ProgressRenderer(self.total, category_totals, verbose=self.verbose)
+        self.progress.start()
+        try:
+            for result in self.iter_check(username, category, platforms, deadline):
+                results.append(result)
+                if on_result is not None:
+                    on_result(result)
+        except ScanInterrupted:
+            results.sort(key=lambda x: x['platform'].lower())
+            raise ScanInterrupted(results)
+        finally:
+            self.progress.stop()
+            self.progress = None
         
         # Sort results by platform name for consistent output
         results.sort(key=lambda x: x['platform'].lower())
         
         return results
     
+    def transfer_totals(self):
+        """Bytes transferred so far by all checkers (wire and decoded)."""
+        totals = {'responses': 0, 'wire_bytes': 0, 'decoded_bytes': 0, 'capped': 0}
+        for checker in list(self.checkers.values()):
+            for key in totals:
+                totals[key] += getattr(checker.transfer, key)
+        return totals
+    
     def get_categories(self):
         """Get list of available platform categories."""
-        categories = set()
-        for platform_config in self.platforms.values():
-            category = platform_config.get('category', 'unknown')
-            categories.add(category)
-        return sorted(list(categories))
+        return list(catalog.get_categories())
     
     def get_platform_names(self):
         """Get list of all platform names."""
-        return sorted(list(self.platforms.keys()))
+        return list(catalog.get_platform_names())
@@ -5,6 +5,7 @@ Utility functions and classes.
 import logging
 import time
 import threading
+import profiler
 
 def setup_logging(debug=False):
     """Setup logging configuration."""
@@ -23,17 +24,26 @@ class RateLimiter:
         self.last_request = 0
         self.lock = threading.Lock()
     
-    def wait(self):
-        """Wait if necessary to maintain rate limit."""
+    def wait(self, cancel_event=None):
+        """Wait if necessary to maintain rate limit; returns at once when cancel_event is set."""
+        start = time.perf_counter()
         with self.lock:
+            acquired = time.perf_counter()
+            if cancel_event is not None and cancel_event.is_set():
+                return
             current_time = time.time()
             time_since_last = current_time - self.last_request
             
             if time_since_last < self.delay:
                 sleep_time = self.delay - time_since_last
-                time.sleep(sleep_time)
+                if cancel_event is None:
+                    time.sleep(sleep_time)
+                elif cancel_event.wait(sleep_time):
+                    return
             
             self.last_request = time.time()
+        profiler.record('rate_limit_lock', acquired - start)
+        profiler.record('rate_limit_sleep', time.perf_counter() - acquired)
 
 def validate_username(username):
     """Enhanced username validation with detailed feedback."""
@@ -0,0 +1,282 @@
+"""
+Watch mode: keep re-checking a watchlist of (username, platform) pairs and
+report only status changes.
+"""
+
+import heapq
+import json
+import os
+import random
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from datetime import datetime
+from colorama import Fore, Style
+
+# Statuses that describe the handle itself; anything else (unknown, error)
+# says more about the probe than the username and never triggers an event.
+DEFINITIVE_STATUSES = ('available', 'taken')
+
+
+def load_watchlist(path):
+    """
+    Load a watchlist file.
+
+    Each non-empty line is either ``username`` (checked on every selected
+    platform) or ``username Platform1,Platform2``. Lines starting with ``#``
+    are ignored.
+
+    Returns:
+        List of (username, platforms or None) tuples
+    """
+    watchlist = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            parts = line.split(None, 1)
+            platforms = None
+            if len(parts) > 1:
+                platforms = [p.strip() for p in parts[1].split(',') if p.strip()]
+            watchlist.append((parts[0], platforms))
+    return watchlist
+
+
+class ConsoleSink:
+    """Print change events to the terminal."""
+
+    def emit(self, event):
+        if event['new_status'] == 'available':
+            color = Fore.GREEN
+        elif event['new_status'] == 'taken':
+            color = Fore.RED
+        else:
+            color = Fore.YELLOW
+        print(f"{Fore.CYAN}[{event['timestamp']}]{Style.RESET_ALL} "
+              f"{Fore.WHITE}{Style.BRIGHT}{event['username']}{Style.RESET_ALL} on "
+              f"{Fore.WHITE}{Style.BRIGHT}{event['platform']}{Style.RESET_ALL}: "
+              f"{event['old_status']} → {color}{Style.BRIGHT}{event['new_status'].upper()}{Style.RESET_ALL} "
+              f"{Fore.CYAN}{Style.DIM}{event['url']}{Style.RESET_ALL}", flush=True)
+
+    def close(self):
+        pass
+
+
+class JsonLinesSink:
+    """Append change events to a file, one JSON object per line."""
+
+    def __init__(self, filepath):
+        self.file = open(filepath, 'a', encoding='utf-8')
+
+    def emit(self, event):
+        self.file.write(json.dumps(event, ensure_ascii=False) + '\n')
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+class Watcher:
+    """
+    Persistent, adaptive re-check schedule on top of UsernameChecker.
+
+    Entries live in a min-heap keyed by their next check time, so each loop
+    iteration only touches entries that are actually due. Every check that
+    confirms the previous status stretches that entry's interval by
+    ``backoff`` (up to ``max_interval``); a change resets it to
+    ``min_interval``, so volatile handles are polled often and stable ones
+    rarely.
+    """
+
+    def __init__(self, checker, state_path, sink, min_interval=300, max_interval=86400,
+                 backoff=2.0, save_interval=30):
+        self.checker = checker
+        self.state_path = state_path
+        self.sink = sink
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.save_interval = save_interval
+
+        self.logger = checker.logger
+        self.entries = {}
+        self.schedule = []
+        self.dirty = False
+        self.last_save = time.time()
+        self.checks_run = 0
+        self.events_emitted = 0
+
+        self._load_state()
+
+    @staticmethod
+    def _key(username, platform_name):
+        return f"{username}|{platform_name}"
+
+    def _load_state(self):
+        """Load the persisted schedule, if any."""
+        if not os.path.exists(self.state_path):
+            return
+        try:
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+        except (OSError, ValueError) as e:
+            self.logger.error(f"Failed to load watch state {self.state_path}: {e}")
+            raise
+        for entry in state.get('entries', []):
+            self.entries[self._key(entry['username'], entry['platform'])] = entry
+
+    def save_state(self):
+        """Atomically write the schedule to disk."""
+        state = {
+            'saved_at': datetime.now().isoformat(),
+            'entries': list(self.entries.values())
+        }
+        tmp_path = f"{self.state_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f, ensure_ascii=False)
+        os.replace(tmp_path, self.state_path)
+        self.dirty = False
+        self.last_save = time.time()
+
+    def sync(self, watchlist, category=None, platforms=None):
+        """
+        Reconcile the persisted schedule with the current watchlist.
+
+        New pairs are scheduled immediately, pairs no longer listed are
+        dropped, and existing pairs keep their status and interval.
+
+        Returns:
+            Number of (username, platform) pairs being watched
+        """
+        wanted = {}
+        for username, line_platforms in watchlist:
+            selected = self.checker.filter_platforms(category, line_platforms or platforms)
+            for platform_name in selected:
+                wanted[self._key(username, platform_name)] = (username, platform_name)
+
+        now = time.time()
+        for key in list(self.entries):
+            if key not in wanted:
+                del self.entries[key]
+                self.dirty = True
+        for key, (username, platform_name) in wanted.items():
+            if key not in self.entries:
+                self.entries[key] = {
+                    'username': username,
+                    'platform': platform_name,
+                    'status': None,
+                    'interval': self.min_interval,
+                    'next_check': now,
+                    'last_checked': None,
+                    'last_changed': None
+                }
+                self.dirty = True
+
+        self.schedule = [(entry['next_check'], key) for key, entry in self.entries.items()]
+        heapq.heapify(self.schedule)
+        return len(self.entries)
+
+    def _next_interval(self, entry, changed):
+        """Pick the next interval for an entry, with a little jitter."""
+        if changed:
+            interval = self.min_interval
+        else:
+            interval = min(entry['interval'] * self.backoff, self.max_interval)
+        entry['interval'] = interval
+        # Spread entries out so a large watchlist doesn't come due in lockstep
+        return interval * random.uniform(0.9, 1.1)
+
+    def _record(self, key, result):
+        """Fold a check result into the schedule and emit an event on change."""
+        entry = self.entries.get(key)
+        if entry is None:
+            return
+
+        now = time.time()
+        self.checks_run += 1
+        entry['last_checked'] = now
+        new_status = result['status']
+        old_status = entry['status']
+        changed = False
+
+        if new_status in DEFINITIVE_STATUSES:
+            if old_status is not None and new_status != old_status:
+                changed = True
+                entry['last_changed'] = now
+                self.events_emitted += 1
+                self.sink.emit({
+                    'timestamp': datetime.now().isoformat(timespec='seconds'),
+                    'username': entry['username'],
+                    'platform': entry['platform'],
+                    'old_status': old_status,
+                    'new_status': new_status,
+                    'url': result.get('url', ''),
+                    'category': result.get('category', 'unknown')
+                })
+            entry['status'] = new_status
+            delay = self._next_interval(entry, changed)
+        else:
+            # Probe failed; retry on the short interval without touching the
+            # learned volatility.
+            delay = self.min_interval * random.uniform(0.9, 1.1)
+
+        entry['next_check'] = now + delay
+        heapq.heappush(self.schedule, (entry['next_check'], key))
+        self.dirty = True
+
+    def _pop_due(self, now, limit):
+        """Pop up to ``limit`` due keys, skipping stale heap items."""
+        due = []
+        while self.schedule and len(due) < limit and self.schedule[0][0] <= now:
+            next_check, key = heapq.heappop(self.schedule)
+            entry = self.entries.get(key)
+            if entry is None or entry['next_check'] != next_check:
+                continue
+            due.append(key)
+        return due
+
+    def run(self, stop_event=None, once=False):
+        """
+        Run the watch loop until ``stop_event`` is set.
+
+        With ``once=True`` the loop exits as soon as nothing is due and
+        nothing is in flight, which suits cron-style invocation.
+        """
+        stop_event = stop_event or threading.Event()
+        max_workers = self.checker.max_workers
+        in_flight = {}
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            try:
+                while not stop_event.is_set():
+                    now = time.time()
+                    for key in self._pop_due(now, max_workers - len(in_flight)):
+                        entry = self.entries[key]
+                        future = executor.submit(self.checker.check_platform,
+                                                 entry['platform'], entry['username'])
+                        in_flight[future] = key
+
+                    if self.dirty and time.time() - self.last_save >= self.save_interval:
+                        self.save_state()
+
+                    if not in_flight:
+                        if once:
+                            break
+                        timeout = self.save_interval
+                        if self.schedule:
+                            timeout = min(timeout, max(0, self.schedule[0][0] - time.time()))
+                        stop_event.wait(timeout)
+                        continue
+
+                    timeout = None
+                    if self.schedule and len(in_flight) < max_workers:
+                        timeout = max(0, self.schedule[0][0] - time.time())
+                    done, _ = wait(in_flight, timeout=timeout, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        self._record(in_flight.pop(future), future.result())
+            finally:
+                for future in in_flight:
+                    future.cancel()
+                if self.dirty:
+                    self.save_state()
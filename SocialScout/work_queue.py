@@ -0,0 +1,466 @@
+"""
+Distributed work queue for spreading scans across processes and machines.
+
+A coordinator enqueues (username, platform) tasks; any number of workers
+lease small batches, run them through their own ``UsernameChecker`` and
+push the results back. Two backends share one interface:
+
+    SQLite  a local file (``scan_queue.db`` or ``sqlite:///path``), for
+            several worker processes on one machine or a shared volume
+    Redis   a ``redis://`` URL (any Redis-compatible server), for workers
+            on different machines; needs the ``redis`` package
+
+Leases expire: a task whose worker died is handed out again once its lease
+runs out, up to ``max_attempts`` times. Tasks are de-duplicated on
+(username, platform), and only the worker currently holding a task's lease
+can extend it or complete it, so a late result from a worker whose lease
+was handed to someone else is ignored. A task that fails on a worker (for
+example on a queue error) is logged and left for its lease to expire. Workers also reserve send slots per host through the queue, so
+the minimum interval between requests to one host holds across the whole
+fleet rather than per process.
+"""
+
+import json
+import os
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+DEFAULT_QUEUE = 'scan_queue.db'
+DEFAULT_LEASE_SECONDS = 120
+DEFAULT_MAX_ATTEMPTS = 3
+# Tasks sent to Redis per enqueue script call
+ENQUEUE_BATCH = 500
+
+SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS tasks (
+        id INTEGER PRIMARY KEY,
+        username TEXT NOT NULL,
+        platform TEXT NOT NULL,
+        state TEXT NOT NULL DEFAULT 'pending',
+        worker TEXT,
+        lease_expires REAL,
+        attempts INTEGER NOT NULL DEFAULT 0,
+        result TEXT,
+        enqueued_at REAL NOT NULL,
+        finished_at REAL,
+        UNIQUE (username, platform)
+    )""",
+    "CREATE INDEX IF NOT EXISTS idx_tasks_state ON tasks (state, lease_expires)",
+    """CREATE TABLE IF NOT EXISTS hosts (
+        host TEXT PRIMARY KEY,
+        next_slot REAL NOT NULL
+    )""",
+]
+
+
+def open_queue(url=DEFAULT_QUEUE, **kwargs):
+    """Open the queue backend a URL or path refers to."""
+    if url.startswith(('redis://', 'rediss://', 'unix://')):
+        return RedisQueue(url, **kwargs)
+    return SQLiteQueue(url, **kwargs)
+
+
+def default_worker_id():
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+class SQLiteQueue:
+    """Work queue in a SQLite file; safe for concurrent processes."""
+
+    def __init__(self, url=DEFAULT_QUEUE, max_attempts=DEFAULT_MAX_ATTEMPTS):
+        import sqlite3
+        self.path = url[len('sqlite:///'):] if url.startswith('sqlite:///') else url
+        self.max_attempts = max_attempts
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Autocommit; write transactions are opened explicitly with
+        # BEGIN IMMEDIATE so concurrent leases never hand out the same task
+        self.conn = sqlite3.connect(self.path, timeout=30, isolation_level=None,
+                                    check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.lock = threading.Lock()
+        for statement in SCHEMA:
+            self.conn.execute(statement)
+
+    def _write(self, fn):
+        with self.lock:
+            self.conn.execute('BEGIN IMMEDIATE')
+            try:
+                value = fn(self.conn)
+            except BaseException:
+                self.conn.execute('ROLLBACK')
+                raise
+            self.conn.execute('COMMIT')
+            return value
+
+    def enqueue(self, tasks):
+        """Add (username, platform) tasks; returns how many were new."""
+        now = time.time()
+        rows = [(username, platform, now) for username, platform in tasks]
+
+        def insert(conn):
+            before = conn.total_changes
+            conn.executemany('INSERT OR IGNORE INTO tasks (username, platform, enqueued_at) '
+                             'VALUES (?, ?, ?)', rows)
+            return conn.total_changes - before
+        return self._write(insert)
+
+    def lease(self, worker_id, limit=10, lease_seconds=DEFAULT_LEASE_SECONDS):
+        """
+        Lease up to ``limit`` pending or expired tasks.
+
+        Returns:
+            List of (task_id, username, platform) tuples
+        """
+        def take(conn):
+            now = time.time()
+            rows = conn.execute(
+                "SELECT id, username, platform FROM tasks "
+                "WHERE (state = 'pending' OR (state = 'leased' AND lease_expires < ?)) "
+                "AND attempts < ? ORDER BY id LIMIT ?",
+                (now, self.max_attempts, limit)).fetchall()
+            conn.executemany(
+                "UPDATE tasks SET state = 'leased', worker = ?, lease_expires = ?, "
+                "attempts = attempts + 1 WHERE id = ?",
+                [(worker_id, now + lease_seconds, row[0]) for row in rows])
+            return [tuple(row) for row in rows]
+        return self._write(take)
+
+    def extend(self, task_ids, worker_id, lease_seconds=DEFAULT_LEASE_SECONDS):
+        """Push back the expiry of leases this worker still holds."""
+        expires = time.time() + lease_seconds
+        self._write(lambda conn: conn.executemany(
+            "UPDATE tasks SET lease_expires = ? WHERE id = ? AND worker = ? AND state = 'leased'",
+            [(expires, task_id, worker_id) for task_id in task_ids]))
+
+    def complete(self, task_id, result, worker_id):
+        """Store a task's result; returns False if this worker no longer holds its lease."""
+        def finish(conn):
+            cursor = conn.execute(
+                "UPDATE tasks SET state = 'done', result = ?, finished_at = ?, lease_expires = NULL "
+                "WHERE id = ? AND worker = ? AND state = 'leased'",
+                (json.dumps(result, ensure_ascii=False), time.time(), task_id, worker_id))
+            return cursor.rowcount == 1
+        return self._write(finish)
+
+    def reserve_host(self, host, interval):
+        """Claim the next send slot for a host; returns seconds to wait for it."""
+        def reserve(conn):
+            now = time.time()
+            row = conn.execute('SELECT next_slot FROM hosts WHERE host = ?', (host,)).fetchone()
+            slot = max(now, row[0]) if row else now
+            conn.execute('INSERT OR REPLACE INTO hosts (host, next_slot) VALUES (?, ?)',
+                         (host, slot + interval))
+            return slot - now
+        return self._write(reserve)
+
+    def stats(self):
+        """Task counts: pending, leased, expired, done and failed (out of attempts)."""
+        now = time.time()
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT "
+                "SUM(state = 'pending' AND attempts < :max), "
+                "SUM(state = 'leased' AND lease_expires >= :now), "
+                "SUM(state = 'leased' AND lease_expires < :now AND attempts < :max), "
+                "SUM(state = 'done'), "
+                "SUM(state != 'done' AND attempts >= :max AND (state = 'pending' OR lease_expires < :now)), "
+                "COUNT(*) FROM tasks", {'now': now, 'max': self.max_attempts}).fetchone()
+        keys = ('pending', 'leased', 'expired', 'done', 'failed', 'total')
+        return {key: value or 0 for key, value in zip(keys, row)}
+
+    def results(self):
+        """Results of finished tasks, in enqueue order."""
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT result FROM tasks WHERE state = 'done' ORDER BY id").fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# Redis scripts keep each operation atomic across workers.
+# KEYS: tasks hash, pending list; ARGV: tasks
+_ENQUEUE_SCRIPT = """
+local added = 0
+for i = 1, #ARGV do
+    if redis.call('HSETNX', KEYS[1], ARGV[i], 'pending') == 1 then
+        redis.call('RPUSH', KEYS[2], ARGV[i])
+        added = added + 1
+    end
+end
+return added
+"""
+
+# KEYS: pending list, leases zset, tasks hash, attempts hash, owners hash
+_LEASE_SCRIPT = """
+local now, limit, expires, max_attempts = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3]), tonumber(ARGV[4])
+for _, task in ipairs(redis.call('ZRANGEBYSCORE', KEYS[2], '-inf', now)) do
+    redis.call('ZREM', KEYS[2], task)
+    redis.call('HDEL', KEYS[5], task)
+    redis.call('RPUSH', KEYS[1], task)
+end
+local leased = {}
+while #leased < limit do
+    local task = redis.call('LPOP', KEYS[1])
+    if not task then break end
+    if redis.call('HGET', KEYS[3], task) == 'pending' then
+        local attempts = redis.call('HINCRBY', KEYS[4], task, 1)
+        if attempts <= max_attempts then
+            redis.call('ZADD', KEYS[2], expires, task)
+            redis.call('HSET', KEYS[5], task, ARGV[5])
+            table.insert(leased, task)
+        else
+            redis.call('HSET', KEYS[3], task, 'failed')
+        end
+    end
+end
+return leased
+"""
+
+# KEYS: tasks hash, leases zset, results hash, owners hash; ARGV: task, result, worker
+_COMPLETE_SCRIPT = """
+if redis.call('HGET', KEYS[1], ARGV[1]) ~= 'pending' then return 0 end
+if redis.call('HGET', KEYS[4], ARGV[1]) ~= ARGV[3] then return 0 end
+redis.call('HSET', KEYS[1], ARGV[1], 'done')
+redis.call('HSET', KEYS[3], ARGV[1], ARGV[2])
+redis.call('ZREM', KEYS[2], ARGV[1])
+redis.call('HDEL', KEYS[4], ARGV[1])
+return 1
+"""
+
+# KEYS: host slot key; returns the wait in microseconds
+_RESERVE_SCRIPT = """
+local now, interval = tonumber(ARGV[1]), tonumber(ARGV[2])
+local slot = math.max(now, tonumber(redis.call('GET', KEYS[1]) or now))
+redis.call('SET', KEYS[1], tostring(slot + interval), 'PX', math.ceil((slot + interval - now) * 1000) + 60000)
+return math.floor((slot - now) * 1000000)
+"""
+
+# KEYS: leases zset, owners hash; ARGV: expiry, worker, tasks...
+_EXTEND_SCRIPT = """
+for i = 3, #ARGV do
+    if redis.call('HGET', KEYS[2], ARGV[i]) == ARGV[2] and redis.call('ZSCORE', KEYS[1], ARGV[i]) then
+        redis.call('ZADD', KEYS[1], ARGV[1], ARGV[i])
+    end
+end
+return 0
+"""
+
+
+class RedisQueue:
+    """
+    Work queue on a Redis-compatible server.
+
+    Tasks are ``["username", "platform"]`` JSON strings: a hash maps each to
+    its state (de-duplication is HSETNX), a list holds pending tasks, a
+    sorted set holds leases scored by expiry and a second hash records
+    which worker holds each lease.
+    """
+
+    def __init__(self, url, max_attempts=DEFAULT_MAX_ATTEMPTS, prefix='socialscout'):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("Redis queues require the redis package (pip install redis)")
+        self.client = redis.Redis.from_url(url, decode_responses=True)
+        self.max_attempts = max_attempts
+        self.keys = {name: f"{prefix}:queue:{name}"
+                     for name in ('pending', 'leases', 'owners', 'tasks', 'attempts', 'results')}
+        self.host_prefix = f"{prefix}:host:"
+        self._enqueue = self.client.register_script(_ENQUEUE_SCRIPT)
+        self._lease = self.client.register_script(_LEASE_SCRIPT)
+        self._complete = self.client.register_script(_COMPLETE_SCRIPT)
+        self._reserve = self.client.register_script(_RESERVE_SCRIPT)
+        self._extend = self.client.register_script(_EXTEND_SCRIPT)
+
+    @staticmethod
+    def _task(username, platform):
+        return json.dumps([username, platform], ensure_ascii=False)
+
+    def enqueue(self, tasks):
+        tasks = [self._task(username, platform) for username, platform in tasks]
+        added = 0
+        for i in range(0, len(tasks), ENQUEUE_BATCH):
+            added += self._enqueue(keys=[self.keys['tasks'], self.keys['pending']],
+                                   args=tasks[i:i + ENQUEUE_BATCH])
+        return added
+
+    def lease(self, worker_id, limit=10, lease_seconds=DEFAULT_LEASE_SECONDS):
+        now = time.time()
+        leased = self._lease(
+            keys=[self.keys['pending'], self.keys['leases'], self.keys['tasks'], self.keys['attempts'],
+                  self.keys['owners']],
+            args=[now, limit, now + lease_seconds, self.max_attempts, worker_id])
+        # The task string doubles as its id
+        return [(task, *json.loads(task)) for task in leased]
+
+    def extend(self, task_ids, worker_id, lease_seconds=DEFAULT_LEASE_SECONDS):
+        if task_ids:
+            self._extend(keys=[self.keys['leases'], self.keys['owners']],
+                         args=[time.time() + lease_seconds, worker_id, *task_ids])
+
+    def complete(self, task_id, result, worker_id):
+        return bool(self._complete(
+            keys=[self.keys['tasks'], self.keys['leases'], self.keys['results'], self.keys['owners']],
+            args=[task_id, json.dumps(result, ensure_ascii=False), worker_id]))
+
+    def reserve_host(self, host, interval):
+        return self._reserve(keys=[self.host_prefix + host], args=[time.time(), interval]) / 1e6
+
+    def stats(self):
+        now = time.time()
+        states = self.client.hvals(self.keys['tasks'])
+        leased = self.client.zcard(self.keys['leases'])
+        expired = self.client.zcount(self.keys['leases'], '-inf', now)
+        done = states.count('done')
+        failed = states.count('failed')
+        return {
+            'pending': self.client.llen(self.keys['pending']),
+            'leased': leased - expired,
+            'expired': expired,
+            'done': done,
+            'failed': failed,
+            'total': len(states),
+        }
+
+    def results(self):
+        return [json.loads(value) for value in self.client.hvals(self.keys['results'])]
+
+    def close(self):
+        self.client.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def plan_tasks(checker, watchlist, category=None, platforms=None):
+    """
+    Expand a watchlist into (username, platform) tasks.
+
+    Args:
+        checker: UsernameChecker whose platform catalog and filters to use
+        watchlist: List of (username, platforms or None), as load_watchlist returns
+        category: Category filter for entries without their own platforms
+        platforms: Platforms for entries without their own platforms
+    """
+    tasks = []
+    for username, line_platforms in watchlist:
+        for platform_name in checker.filter_platforms(category, line_platforms or platforms):
+            tasks.append((username, platform_name))
+    return tasks
+
+
+class QueueWorker:
+    """
+    Pulls leases from a queue and runs them through a UsernameChecker.
+
+    Leased tasks are checked concurrently on the checker's worker count.
+    Before each request the worker waits for the host's next fleet-wide
+    send slot, and it keeps its leases alive while a batch is running.
+    """
+
+    def __init__(self, queue, checker, worker_id=None, batch_size=None,
+                 lease_seconds=DEFAULT_LEASE_SECONDS, host_interval=1.0, poll_interval=2.0):
+        self.queue = queue
+        self.checker = checker
+        self.worker_id = worker_id or default_worker_id()
+        self.batch_size = batch_size or checker.max_workers
+        self.lease_seconds = lease_seconds
+        self.host_interval = host_interval
+        self.poll_interval = poll_interval
+        self.logger = checker.logger
+        self.queue_lock = threading.Lock()
+        self.completed = 0
+        self.duplicates = 0
+        self.failed = 0
+
+    def _host(self, platform_config, username):
+        pattern = platform_config.get('api_url') if platform_config.get('checker_type') == 'api' else None
+        pattern = pattern or platform_config.get('url_pattern', '')
+        return urlsplit(pattern.format(username=username)).hostname or ''
+
+    def _run_task(self, task):
+        task_id, username, platform_name = task
+        platform_config = self.checker.platforms.get(platform_name)
+        if platform_config is None:
+            result = {'platform': platform_name, 'username': username, 'status': 'error',
+                      'url': '', 'response_time': 0, 'category': 'unknown',
+                      'error': f"Unknown platform on worker {self.worker_id}"}
+        else:
+            if self.host_interval > 0:
+                with self.queue_lock:
+                    delay = self.queue.reserve_host(self._host(platform_config, username), self.host_interval)
+                if delay > 0:
+                    time.sleep(delay)
+            result = self.checker.check_platform(platform_name, username, platform_config)
+        result['worker'] = self.worker_id
+        with self.queue_lock:
+            if self.queue.complete(task_id, result, self.worker_id):
+                self.completed += 1
+            else:
+                self.duplicates += 1
+        return result
+
+    def _try_task(self, task):
+        """Run a task; on failure log it and return None, leaving the lease to expire."""
+        try:
+            return self._run_task(task)
+        except Exception as e:
+            self.logger.error(f"Task {task[1]}/{task[2]} failed on worker {self.worker_id}: {e}")
+            with self.queue_lock:
+                self.failed += 1
+            return None
+
+    def _keep_alive(self, task_ids, done):
+        while not done.wait(self.lease_seconds / 3):
+            with self.queue_lock:
+                self.queue.extend(task_ids, self.worker_id, self.lease_seconds)
+
+    def run(self, stop_event=None, exit_when_empty=False, on_result=None):
+        """Work until stopped, or until the queue has nothing left to lease if exit_when_empty."""
+        stop_event = stop_event or threading.Event()
+        with ThreadPoolExecutor(max_workers=self.checker.max_workers) as executor:
+            while not stop_event.is_set():
+                try:
+                    with self.queue_lock:
+                        tasks = self.queue.lease(self.worker_id, self.batch_size, self.lease_seconds)
+                except Exception as e:
+                    self.logger.error(f"Leasing from the queue failed on worker {self.worker_id}: {e}")
+                    stop_event.wait(self.poll_interval)
+                    continue
+                if not tasks:
+                    if exit_when_empty:
+                        with self.queue_lock:
+                            stats = self.queue.stats()
+                        if not stats['pending'] and not stats['leased'] and not stats['expired']:
+                            break
+                    stop_event.wait(self.poll_interval)
+                    continue
+
+                done = threading.Event()
+                keeper = threading.Thread(target=self._keep_alive,
+                                          args=([task[0] for task in tasks], done), daemon=True)
+                keeper.start()
+                try:
+                    for result in executor.map(self._try_task, tasks):
+                        if result is not None and on_result is not None:
+                            on_result(result)
+                finally:
+                    done.set()
+                    keeper.join()